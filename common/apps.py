@@ -1,6 +1,13 @@
+import os
+
 from django.apps import AppConfig
+from django.conf import settings
 
 
 class CommonConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'common'
+
+    def ready(self):
+        for d in settings.NEEDED_DIRS:
+            os.makedirs(d, exist_ok=True)
@@ -1,9 +1,22 @@
+import copy
+
 from django.utils import timezone
 from rest_framework import serializers
 
 from common.models import Configuration
 
 
+class CachedFieldsSerializerMixin:
+    """Builds the serializer fields once per class and hands out copies afterwards."""
+    _compiled_fields = None
+
+    def get_fields(self):
+        cls = self.__class__
+        if cls.__dict__.get('_compiled_fields') is None:
+            cls._compiled_fields = super(CachedFieldsSerializerMixin, self).get_fields()
+        return copy.deepcopy(cls._compiled_fields)
+
+
 class CommonConfigurationSerializer(serializers.ModelSerializer):
     server_time = serializers.SerializerMethodField()
 
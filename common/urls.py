@@ -1,7 +1,7 @@
-from rest_framework.routers import DefaultRouter
+from rest_framework.routers import SimpleRouter
 
 from common.views import ConfigurationViewSet
 
-router = DefaultRouter()
+router = SimpleRouter()
 
 router.register('common/configuration', ConfigurationViewSet, basename='common-configuration')
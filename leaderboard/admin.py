@@ -19,6 +19,8 @@ class LeaderboardRewardInlineAdmin(admin.TabularInline):
 class LeaderboardAdmin(admin.ModelAdmin):
     raw_id_fields = ['player', ]
     list_display = ['player', 'score', ]
+    list_select_related = ['player', ]
+    show_full_result_count = False
     fieldsets = [(None, {'fields': ['player', 'score']})]
 
     def has_change_permission(self, request, obj=None):
@@ -9,6 +9,7 @@ from django_celery_beat.models import PeriodicTask, ClockedSchedule
 from redis import Redis
 
 from leaderboard.documents import LeaderboardDocument
+from suji.redis import get_pipeline
 from user.models import User
 
 
@@ -29,6 +30,12 @@ class LeaderboardRedis:
     def increment_player_score(self, key, member, score):
         return self._redis.zincrby(key, score, member)
 
+    def increment_player_scores(self, keys, member, score):
+        pipeline = get_pipeline(self._redis)
+        for key in keys:
+            pipeline.zincrby(key, score, member)
+        return pipeline.execute()
+
     def update_player_score(self, key, member, score):
         return self._redis.zadd(key, mapping={
             member: score
@@ -43,35 +50,53 @@ class LeaderboardRedis:
         return self._redis.zrevrank(key, member, withscore=True)
 
     def get_surrounding_players(self, key, member, offset=5):
-        player_rank = self.get_player_rank(key, member)[0]
+        return self._get_players_around_rank(key, self.get_player_rank(key, member), offset)
+
+    def _get_players_around_rank(self, key, player_rank, offset):
         if not player_rank:
             return []
-        return self._redis.zrevrange(key, start=max(0, player_rank - offset), end=player_rank + offset, withscores=True)
+        rank = player_rank[0]
+        return self._redis.zrevrange(key, start=max(0, rank - offset), end=rank + offset, withscores=True)
+
+    def get_player_standing(self, key, member, limit=10, offset=5):
+        if limit > self.TOP_PLAYER_COUNT_LIMIT or limit <= 0:
+            raise ValueError(_(f"Limit should be from 1 to {self.TOP_PLAYER_COUNT_LIMIT}"))
+        pipeline = get_pipeline(self._redis)
+        pipeline.zrevrange(key, start=0, end=limit, withscores=True)
+        pipeline.zrevrank(key, member, withscore=True)
+        top_players, player_rank = pipeline.execute()
+        return top_players, player_rank, self._get_players_around_rank(key, player_rank, offset)
 
     def get_range(self, key, start, stop):
         return self._redis.zrevrange(key, start, stop)
 
     def get_leaderboard(self, key):
-        count = self._redis.zcard(key)
-        return self._redis.zrevrange(key, start=0, end=count, withscores=True)
+        return self._redis.zrevrange(key, start=0, end=-1, withscores=True)
 
     @classmethod
-    def get_leaderboard_with_players(cls, leaderboard):
+    def get_leaderboard_with_players(cls, leaderboard, player_details=None):
         player_score = {player_id: score for player_id, score in leaderboard}
         players = list(player_score.keys())
-        player_details = []
-        if players:
-            player_details = settings.REDIS_CLIENT.hmget("USERS", players)
+        if player_details is None:
+            player_details = cls.get_player_details(players)
+        else:
+            player_details = [player_details.get(player) for player in players]
         results = []
 
         for index, (pid, detail) in enumerate(zip(players, player_details)):
             if detail:
-                detail = json.loads(detail)
-                detail['score'] = player_score[pid]
-                detail['rank'] = index + 1
-                results.append(detail)
+                results.append({**detail, 'score': player_score[pid], 'rank': index + 1})
         return results
 
+    @staticmethod
+    def get_player_details(players) -> list:
+        return User.bulk_from_cache(players)
+
+    @classmethod
+    def get_player_details_mapping(cls, *leaderboards) -> dict:
+        players = list({player_id for leaderboard in leaderboards for player_id, __ in leaderboard})
+        return dict(zip(players, cls.get_player_details(players)))
+
 
 class LeaderboardReward(models.Model):
     reward = models.ForeignKey(to="shop.RewardPackage", on_delete=models.CASCADE, verbose_name=_("Reward"))
@@ -187,11 +212,11 @@ class LeaderboardType(models.Model):
     def get_leaderboard(self, player_id):
         leaderboard_redis = LeaderboardRedis(settings.REDIS_CLIENT)
         leaderboard_key = self.leaderboard_type_key
-        top_players = leaderboard_redis.get_top_players(leaderboard_key, limit=100)
-        player_rank = leaderboard_redis.get_player_rank(leaderboard_key, player_id)
-        surrounding_players = leaderboard_redis.get_surrounding_players(leaderboard_key, player_id)
-        top_players = LeaderboardRedis.get_leaderboard_with_players(top_players)
-        surrounding_players = LeaderboardRedis.get_leaderboard_with_players(surrounding_players)
+        top_players, player_rank, surrounding_players = leaderboard_redis.get_player_standing(
+            leaderboard_key, player_id, limit=100)
+        player_details = LeaderboardRedis.get_player_details_mapping(top_players, surrounding_players)
+        top_players = LeaderboardRedis.get_leaderboard_with_players(top_players, player_details)
+        surrounding_players = LeaderboardRedis.get_leaderboard_with_players(surrounding_players, player_details)
         return top_players, surrounding_players, player_rank
 
 
@@ -205,8 +230,7 @@ class Leaderboard(models.Model):
         self.save()
         types = LeaderboardType.objects.filter(is_active=True, start_time__lte=timezone.now())
         leaderboard_redis = LeaderboardRedis(settings.REDIS_CLIENT)
-        for t in types:
-            leaderboard_redis.increment_player_score(t.leaderboard_type_key, self.player.id, score)
+        leaderboard_redis.increment_player_scores([t.leaderboard_type_key for t in types], self.player_id, score)
 
     def __str__(self):
         return f'{self.player} - {self.score}'
@@ -14,5 +14,5 @@ class LeaderboardTypeSerializer(serializers.ModelSerializer):
     @staticmethod
     def get_time_remaining(obj):
         if obj.duration:
-            return (obj.start_time + obj.duration) - timezone.now()
+            return str(((obj.start_time + obj.duration) - timezone.now()).total_seconds())
         return None
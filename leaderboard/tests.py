@@ -15,65 +15,66 @@ from shop.models import RewardPackage, ShopConfiguration
 class LeaderboardTypeViewSetTests(APITestCase):
     """Test LeaderboardTypeViewSet behaviors for leaderboard management and viewing"""
 
-    def setUp(self):
-        """Create test users, leaderboard types, and test data"""
+    @classmethod
+    def setUpTestData(cls):
+        """Create test users, leaderboard types, and test data once per class"""
         # Create initial package and shop config for player creation
-        self.initial_package = RewardPackage.objects.create(
+        cls.initial_package = RewardPackage.objects.create(
             name='Initial Package',
             reward_type=RewardPackage.RewardType.INIT_WALLET
         )
-        self.shop_config = ShopConfiguration.objects.create(
-            player_initial_package=self.initial_package
+        cls.shop_config = ShopConfiguration.objects.create(
+            player_initial_package=cls.initial_package
         )
 
         # Create test users
-        self.user = NormalPlayer.objects.create_user(
+        cls.user = NormalPlayer.objects.create_user(
             email='user@example.com',
             password='password123',
             profile_name='TestUser'
         )
-        self.user.is_verified = True
-        self.user.save()
+        cls.user.is_verified = True
+        cls.user.save(update_fields=['is_verified'])
 
-        self.other_user = NormalPlayer.objects.create_user(
+        cls.other_user = NormalPlayer.objects.create_user(
             email='other@example.com',
             password='password123',
             profile_name='OtherUser'
         )
-        self.other_user.is_verified = True
-        self.other_user.save()
+        cls.other_user.is_verified = True
+        cls.other_user.save(update_fields=['is_verified'])
 
-        self.guest_user = GuestPlayer.objects.create_user(
+        cls.guest_user = GuestPlayer.objects.create_user(
             device_id='guest-device-123',
             password='password123'
         )
 
         # Create rewards for leaderboards
-        self.winner_reward = RewardPackage.objects.create(
+        cls.winner_reward = RewardPackage.objects.create(
             name='Winner Reward',
             reward_type=RewardPackage.RewardType.MATCH_REWARD
         )
-        self.participant_reward = RewardPackage.objects.create(
+        cls.participant_reward = RewardPackage.objects.create(
             name='Participant Reward',
             reward_type=RewardPackage.RewardType.MATCH_REWARD
         )
 
         # Create active leaderboard types
-        self.weekly_leaderboard = LeaderboardType.objects.create(
+        cls.weekly_leaderboard = LeaderboardType.objects.create(
             name='Weekly Tournament',
             is_active=True,
             duration=timedelta(days=7),
             start_time=timezone.now() - timedelta(days=2)  # Started 2 days ago
         )
 
-        self.monthly_leaderboard = LeaderboardType.objects.create(
+        cls.monthly_leaderboard = LeaderboardType.objects.create(
             name='Monthly Championship',
             is_active=True,
             duration=timedelta(days=30),
             start_time=timezone.now() - timedelta(days=5)  # Started 5 days ago
         )
 
-        self.infinite_leaderboard = LeaderboardType.objects.create(
+        cls.infinite_leaderboard = LeaderboardType.objects.create(
             name='All Time Leaderboard',
             is_active=True,
             duration=None,  # Infinite duration
@@ -81,7 +82,7 @@ class LeaderboardTypeViewSetTests(APITestCase):
         )
 
         # Create inactive leaderboard (should not appear)
-        self.inactive_leaderboard = LeaderboardType.objects.create(
+        cls.inactive_leaderboard = LeaderboardType.objects.create(
             name='Inactive Tournament',
             is_active=False,
             duration=timedelta(days=7),
@@ -90,22 +91,24 @@ class LeaderboardTypeViewSetTests(APITestCase):
 
         # Create rewards for leaderboard types
         LeaderboardReward.objects.create(
-            leaderboard_type=self.weekly_leaderboard,
-            reward=self.winner_reward,
+            leaderboard_type=cls.weekly_leaderboard,
+            reward=cls.winner_reward,
             from_rank=1,
             to_rank=3
         )
         LeaderboardReward.objects.create(
-            leaderboard_type=self.weekly_leaderboard,
-            reward=self.participant_reward,
+            leaderboard_type=cls.weekly_leaderboard,
+            reward=cls.participant_reward,
             from_rank=4,
             to_rank=10
         )
 
-    def test_authenticated_user_can_list_active_leaderboard_types(self):
-        """Authenticated users should see list of active leaderboard types"""
+    def setUp(self):
+        """Authenticate the client as the default test user"""
         self.client.force_authenticate(user=self.user)
 
+    def test_authenticated_user_can_list_active_leaderboard_types(self):
+        """Authenticated users should see list of active leaderboard types"""
         response = self.client.get(reverse('leaderboard-list'))
 
         self.assertEqual(response.status_code, status.HTTP_200_OK)
@@ -119,14 +122,13 @@ class LeaderboardTypeViewSetTests(APITestCase):
 
     def test_unauthenticated_user_cannot_list_leaderboards(self):
         """Unauthenticated users cannot access leaderboards"""
+        self.client.force_authenticate(user=None)
         response = self.client.get(reverse('leaderboard-list'))
 
         self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
 
     def test_leaderboard_list_includes_time_information(self):
         """Leaderboard list should include timing information"""
-        self.client.force_authenticate(user=self.user)
-
         response = self.client.get(reverse('leaderboard-list'))
 
         self.assertEqual(response.status_code, status.HTTP_200_OK)
@@ -142,8 +144,6 @@ class LeaderboardTypeViewSetTests(APITestCase):
 
     def test_leaderboard_time_remaining_calculation_for_active_tournaments(self):
         """Active leaderboards should show reasonable time remaining"""
-        self.client.force_authenticate(user=self.user)
-
         response = self.client.get(reverse('leaderboard-list'))
 
         self.assertEqual(response.status_code, status.HTTP_200_OK)
@@ -179,7 +179,6 @@ class LeaderboardTypeViewSetTests(APITestCase):
                 start_time=timezone.now()
             )
 
-        self.client.force_authenticate(user=self.user)
         response = self.client.get(reverse('leaderboard-list'))
 
         self.assertEqual(response.status_code, status.HTTP_200_OK)
@@ -189,16 +188,12 @@ class LeaderboardTypeViewSetTests(APITestCase):
 
     def test_retrieving_inactive_leaderboard_returns_404(self):
         """Inactive leaderboards should not be accessible"""
-        self.client.force_authenticate(user=self.user)
-
         response = self.client.get(reverse('leaderboard-detail', kwargs={'pk': self.inactive_leaderboard.id}))
 
         self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
 
     def test_retrieving_nonexistent_leaderboard_returns_404(self):
         """Non-existent leaderboards should return 404"""
-        self.client.force_authenticate(user=self.user)
-
         response = self.client.get(reverse('leaderboard-detail', kwargs={'pk': 99999}))
 
         self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
@@ -262,8 +257,6 @@ class LeaderboardTypeViewSetTests(APITestCase):
             mock_player_rank
         )
 
-        self.client.force_authenticate(user=self.user)
-
         response = self.client.get(reverse('leaderboard-detail', kwargs={'pk': self.weekly_leaderboard.id}))
 
         self.assertEqual(response.status_code, status.HTTP_200_OK)
@@ -324,8 +317,6 @@ class LeaderboardTypeViewSetTests(APITestCase):
             mock_player_rank
         )
 
-        self.client.force_authenticate(user=self.user)
-
         response = self.client.get(reverse('leaderboard-detail', kwargs={'pk': self.weekly_leaderboard.id}))
 
         self.assertEqual(response.status_code, status.HTTP_200_OK)
@@ -342,8 +333,6 @@ class LeaderboardTypeViewSetTests(APITestCase):
         # Mock empty leaderboard response
         mock_get_leaderboard.return_value = ([], [], (None, 0.0))
 
-        self.client.force_authenticate(user=self.user)
-
         response = self.client.get(reverse('leaderboard-detail', kwargs={'pk': self.weekly_leaderboard.id}))
 
         self.assertEqual(response.status_code, status.HTTP_200_OK)
@@ -392,8 +381,6 @@ class LeaderboardTypeViewSetTests(APITestCase):
             mock_player_rank
         )
 
-        self.client.force_authenticate(user=self.user)
-
         response = self.client.get(reverse('leaderboard-detail', kwargs={'pk': self.weekly_leaderboard.id}))
 
         self.assertEqual(response.status_code, status.HTTP_200_OK)
@@ -422,8 +409,6 @@ class LeaderboardTypeViewSetTests(APITestCase):
 
         mock_get_leaderboard.return_value = (mock_top_players, [], (0, 1200.0))
 
-        self.client.force_authenticate(user=self.user)
-
         response = self.client.get(reverse('leaderboard-detail', kwargs={'pk': self.weekly_leaderboard.id}))
 
         self.assertEqual(response.status_code, status.HTTP_200_OK)
@@ -442,8 +427,6 @@ class LeaderboardTypeViewSetTests(APITestCase):
         with patch('leaderboard.models.LeaderboardType.get_leaderboard') as mock_get_leaderboard:
             mock_get_leaderboard.return_value = ([], [], (None, 0.0))
 
-            self.client.force_authenticate(user=self.user)
-
             response = self.client.get(reverse('leaderboard-detail', kwargs={'pk': self.weekly_leaderboard.id}))
 
             self.assertEqual(response.status_code, status.HTTP_200_OK)
@@ -460,8 +443,6 @@ class LeaderboardTypeViewSetTests(APITestCase):
         with patch('leaderboard.models.LeaderboardType.get_leaderboard') as mock_get_leaderboard:
             mock_get_leaderboard.return_value = ([], [], (None, 0.0))
 
-            self.client.force_authenticate(user=self.user)
-
             response = self.client.get(reverse('leaderboard-detail', kwargs={'pk': self.infinite_leaderboard.id}))
 
             self.assertEqual(response.status_code, status.HTTP_200_OK)
@@ -473,8 +454,6 @@ class LeaderboardTypeViewSetTests(APITestCase):
         # Simulate Redis connection error
         mock_get_leaderboard.side_effect = Exception("Redis connection failed")
 
-        self.client.force_authenticate(user=self.user)
-
         response = self.client.get(reverse('leaderboard-detail', kwargs={'pk': self.weekly_leaderboard.id}))
 
         # Should return 500 or handle gracefully, not crash the system
@@ -482,6 +461,7 @@ class LeaderboardTypeViewSetTests(APITestCase):
 
     def test_leaderboard_endpoint_requires_authentication(self):
         """Leaderboard detail endpoint should require authentication"""
+        self.client.force_authenticate(user=None)
         response = self.client.get(reverse('leaderboard-detail', kwargs={'pk': self.weekly_leaderboard.id}))
 
         self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
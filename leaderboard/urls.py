@@ -1,7 +1,7 @@
-from rest_framework.routers import DefaultRouter
+from rest_framework.routers import SimpleRouter
 
 from leaderboard.views import LeaderboardTypeViewSet
 
-router = DefaultRouter()
+router = SimpleRouter()
 
 router.register("leaderboard", LeaderboardTypeViewSet, basename="leaderboard")
@@ -10,6 +10,8 @@ from match.models import Match, MatchType, MatchConfiguration, MatchResult
 class MatchAdmin(admin.ModelAdmin):
     list_display = ['uuid', 'match_type', ]
     list_filter = ['match_type', ]
+    list_select_related = ['match_type', ]
+    show_full_result_count = False
     readonly_fields = ['uuid', 'players', ]
     search_fields = ['uuid', ]
 
@@ -44,6 +46,8 @@ class MatchConfigurationAdmin(admin.ModelAdmin):
 @admin.register(MatchResult)
 class MatchResultAdmin(admin.ModelAdmin):
     list_display = ['match_uuid', 'match_type']
+    list_select_related = ['match_type', ]
+    show_full_result_count = False
     filter_horizontal = ['players']
     readonly_fields = ['players', ]
 
@@ -11,7 +11,7 @@ def _seen_event(event_id: str) -> bool:
     if _redis:
         return not _redis.set(name=f"evt:{event_id}", value="1", nx=True, ex=24*3600)
 
-@shared_task(name="events.handle_game_started", acks_late=True)
+@shared_task(name="events.handle_game_started", queue="game.events.start", acks_late=True)
 def handle_game_started(raw_body: dict):
     if isinstance(raw_body, str):
         raw_body = json.loads(raw_body)
@@ -1,4 +1,6 @@
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from django.core.cache import cache
 from rest_framework.test import APITestCase
@@ -56,7 +58,7 @@ class MatchTypeViewSetTests(APITestCase):
             profile_name='TestUser'
         )
         self.user.is_verified = True
-        self.user.save()
+        self.user.save(update_fields=['is_verified'])
 
         self.low_level_user = NormalPlayer.objects.create_user(
             email='newbie@example.com',
@@ -64,7 +66,7 @@ class MatchTypeViewSetTests(APITestCase):
             profile_name='NewbieUser'
         )
         self.low_level_user.is_verified = True
-        self.low_level_user.save()
+        self.low_level_user.save(update_fields=['is_verified'])
 
         self.guest_user = GuestPlayer.objects.create_user(
             device_id='guest-device-123',
@@ -266,14 +268,16 @@ class MatchTypeViewSetTests(APITestCase):
     def test_match_types_are_paginated(self):
         """Match types list should support pagination"""
         # Create many match types
-        for i in range(25):
-            MatchType.objects.create(
+        MatchType.objects.bulk_create([
+            MatchType(
                 name=f'Match Type {i}',
                 priority=i + 10,
                 min_xp=0,
                 min_cup=0,
                 min_score=0
             )
+            for i in range(25)
+        ])
 
         self.client.force_authenticate(user=self.user)
         response = self.client.get(reverse('match_type-list'))
@@ -309,7 +313,7 @@ class MatchViewSetTests(APITestCase):
             profile_name='TestUser'
         )
         self.user.is_verified = True
-        self.user.save()
+        self.user.save(update_fields=['is_verified'])
 
         self.opponent = NormalPlayer.objects.create_user(
             email='opponent@example.com',
@@ -317,7 +321,7 @@ class MatchViewSetTests(APITestCase):
             profile_name='OpponentUser'
         )
         self.opponent.is_verified = True
-        self.opponent.save()
+        self.opponent.save(update_fields=['is_verified'])
 
         self.other_user = NormalPlayer.objects.create_user(
             email='other@example.com',
@@ -325,7 +329,7 @@ class MatchViewSetTests(APITestCase):
             profile_name='OtherUser'
         )
         self.other_user.is_verified = True
-        self.other_user.save()
+        self.other_user.save(update_fields=['is_verified'])
 
         self.forth_user = NormalPlayer.objects.create_user(
             email='forth@example.com',
@@ -334,7 +338,7 @@ class MatchViewSetTests(APITestCase):
         )
 
         self.forth_user.is_verified = True
-        self.forth_user.save()
+        self.forth_user.save(update_fields=['is_verified'])
 
         # Create match type
         self.match_type = MatchType.objects.create(
@@ -380,6 +384,23 @@ class MatchViewSetTests(APITestCase):
         # self.assertNotIn(str(self.opponent_match.uuid), match_uuids)
         self.assertNotIn(str(self.other_match.uuid), match_uuids)
 
+    def test_match_list_query_count_does_not_grow_with_players(self):
+        """Listing matches should load player profiles and avatars in batches, not per player"""
+        self.client.force_authenticate(user=self.user)
+        with CaptureQueriesContext(connection) as initial_queries:
+            self.client.get(reverse('match-list'))
+
+        for i in range(3):
+            player = NormalPlayer.objects.create_user(email=f'extra{i}@example.com', password='password123',
+                                                      is_verified=True)
+            self.user_match.players.add(player)
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('match-list'))
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(queries), len(initial_queries))
+
     def test_user_sees_empty_list_when_no_matches(self):
         """Users with no matches should see empty list"""
         self.client.force_authenticate(user=self.other_user)
@@ -606,3 +627,50 @@ class MatchViewSetTests(APITestCase):
     def tearDown(self):
         """Clear cache after each test"""
         cache.clear()
+
+
+class GameEventsConsumerTests(TestCase):
+    """Test the game.events.start consumer for raw and Celery formatted game events"""
+
+    def setUp(self):
+        """Create the consumer step with a stub worker consumer"""
+        from suji.celery import GameEventsConsumer
+
+        self.parent = MagicMock()
+        self.step = GameEventsConsumer(self.parent)
+
+    def test_task_consumer_does_not_read_game_events_queue(self):
+        """The Celery task consumer leaves game.events.start to this step"""
+        self.parent.app.amqp.queues.deselect.assert_called_once_with('game.events.start')
+
+    @patch('match.tasks.handle_game_started.run')
+    def test_raw_json_event_is_handled_in_process(self, mock_run):
+        """A header-less JSON event runs the handler directly and is acked"""
+        message = MagicMock(headers={})
+        body = {'event_id': str(uuid4())}
+
+        self.step.on_message(body, message)
+
+        mock_run.assert_called_once_with(body)
+        message.ack.assert_called_once()
+        message.reject.assert_not_called()
+
+    @patch('match.tasks.handle_game_started.run')
+    def test_celery_task_message_is_handled_in_process(self, mock_run):
+        """A Celery task message is unpacked into the handler arguments"""
+        message = MagicMock(headers={'task': 'events.handle_game_started'})
+        body = {'event_id': str(uuid4())}
+
+        self.step.on_message([[body], {}, {}], message)
+
+        mock_run.assert_called_once_with(body)
+        message.ack.assert_called_once()
+
+    def test_failed_event_is_dead_lettered(self):
+        """An event the handler rejects is not requeued so it lands in the dead letter queue"""
+        message = MagicMock(headers={})
+
+        self.step.on_message({}, message)
+
+        message.reject.assert_called_once_with(requeue=False)
+        message.ack.assert_not_called()
@@ -1,8 +1,8 @@
-from rest_framework.routers import DefaultRouter
+from rest_framework.routers import SimpleRouter
 
 from match.views import MatchTypeViewSet, MatchViewSet
 
-router = DefaultRouter()
+router = SimpleRouter()
 
 router.register('match_type', MatchTypeViewSet, basename='match_type')
 router.register('match', MatchViewSet, basename='match')
@@ -10,6 +10,7 @@ from match.exceptions import MatchJoinError
 from match.models import MatchType, Match
 from match.permissions import IsGameServer
 from match.serializers import MatchTypeSerializer, MatchSerializer, MatchCreateSerializer, MatchFinishSerializer
+from user.serializers import PlayerProfileSerializer
 
 
 class MatchTypeViewSet(GenericViewSet, mixins.ListModelMixin, mixins.RetrieveModelMixin):
@@ -50,6 +51,8 @@ class MatchViewSet(GenericViewSet, mixins.ListModelMixin, mixins.RetrieveModelMi
         qs = super().get_queryset()
         if self.request.user.is_authenticated:
             qs = qs.filter(players=self.request.user)
+        if self.action in ('list', 'retrieve', ):
+            qs = PlayerProfileSerializer.setup_eager_loading(qs.select_related('match_type'), 'players')
         return qs
 
     def get_current_player_match(self) -> Match:
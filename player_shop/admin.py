@@ -22,6 +22,8 @@ class PlayerWalletAdmin(admin.ModelAdmin):
 class PlayerWalletLogAdmin(admin.ModelAdmin):
     list_display = ['player', 'transaction_id', 'currency', 'amount', 'asset', 'transaction_type', ]
     list_filter = ['currency', 'asset', 'transaction_type', ]
+    list_select_related = ['player', 'currency', 'asset', ]
+    show_full_result_count = False
 
     def has_add_permission(self, request):
         return False
@@ -34,4 +36,7 @@ class PlayerWalletLogAdmin(admin.ModelAdmin):
 class PlayerRewardPackageAdmin(admin.ModelAdmin):
     list_display = ('player', 'package', 'created_time', )
     list_filter = ('package', )
+    list_select_related = ('player', 'package', )
+    raw_id_fields = ('player', )
     date_hierarchy = 'created_time'
+    show_full_result_count = False
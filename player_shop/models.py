@@ -1,7 +1,8 @@
 from typing import Union
 
 from django.db import models
-from django.db.models.signals import post_save
+from django.db.models import F, Prefetch
+from django.db.models.signals import post_save, post_delete
 from django.db.transaction import atomic
 from django.dispatch import receiver
 from django.utils import timezone
@@ -60,42 +61,43 @@ class PlayerWallet(BaseModel):
         if package.price_currency.type == package.price_currency.CurrencyType.REAL:
             raise WrongShopFlowError(_(f"{package.name} must be bought through market verification."))
 
-        if not self.has_enough_credit(package.price_currency, package.final_price):
+        try:
+            self.add_shop_package(package, description="buying.")
+        except NotEnoughCreditError:
             raise NotEnoughCreditError(_(f"Player does not have enough {package.price_currency} for {package.name}."))
 
-        self.add_shop_package(package, description="buying.")
-
     def pay(self, currency: Currency, amount: int, description: str = None):
-        if self.has_enough_credit(currency=currency, amount=amount):
-            player_currency = self.get_player_currency(currency)
-            player_currency.balance -= amount
-            player_currency.save()
-            PlayerWalletLog.objects.create(player=self.player, description=description,
-                                           transaction_type=PlayerWalletLog.TransactionType.SPEND,
-                                           currency=currency, amount=amount)
-        else:
+        updated = self.currency_balances.filter(currency=currency, balance__gte=amount) \
+            .update(balance=F('balance') - amount)
+        if not updated:
             raise NotEnoughCreditError(_(f"Player does not have enough {currency} to pay."))
+        PlayerWalletLog.objects.create(player=self.player, description=description,
+                                       transaction_type=PlayerWalletLog.TransactionType.SPEND,
+                                       currency=currency, amount=amount)
 
     def _add_package_base(self, package: Package, description):
         player_wallet_log_objects = []
-        for item in package.currency_items.all():
-            player_currency = self.get_or_create_currency(item.currency)
-            player_currency.balance += item.amount
-            description = f"{self.player} earned {item.amount} X {item.currency} from {description}"
-            player_wallet_log_objects.append(PlayerWalletLog(player=self.player, description=description,
-                                                             transaction_type=PlayerWalletLog.TransactionType.EARN,
-                                                             currency=item.currency, amount=item.amount), )
-            player_currency.save()
+        for item in package.currency_items.select_related('currency'):
+            updated = self.currency_balances.filter(currency=item.currency) \
+                .update(balance=F('balance') + item.amount)
+            if not updated:
+                CurrencyBalance.objects.create(wallet=self, currency=item.currency, balance=item.amount)
+            log_description = f"{self.player} earned {item.amount} X {item.currency} from {description}"
+            player_wallet_log_objects.append(PlayerWalletLog(
+                player=self.player, description=log_description, transaction_type=PlayerWalletLog.TransactionType.EARN,
+                currency=item.currency, amount=item.amount
+            ))
+        asset_items = list(package.asset_items.all())
+        owned_asset_ids = set(self.asset_ownerships.filter(asset__in=asset_items).values_list('asset_id', flat=True))
         assets = []
-        for item in package.asset_items.all():
-            player_asset = self.get_player_asset(asset=item)
-            if player_asset:
+        for item in asset_items:
+            if item.id in owned_asset_ids:
                 continue
             assets.append(AssetOwnership(wallet_id=self.id, asset=item))
-            description = f"{self.player} earned {item} from {description}"
-            player_wallet_log_objects.append(PlayerWalletLog(player=self.player, description=description,
-                                                             transaction_type=PlayerWalletLog.TransactionType.EARN,
-                                                             asset=item))
+            player_wallet_log_objects.append(PlayerWalletLog(
+                player=self.player, description=f"{self.player} earned {item} from {description}",
+                transaction_type=PlayerWalletLog.TransactionType.EARN, asset=item
+            ))
         self.asset_ownerships.bulk_create(assets)
         PlayerWalletLog.objects.bulk_create(player_wallet_log_objects)
 
@@ -126,13 +128,13 @@ class PlayerWallet(BaseModel):
         if daily_reward_package.exists():
             self.add_reward_package(daily_reward_package.first().reward)
 
+    @atomic()
     def spin_lucky_wheel(self, lucky_wheel: LuckyWheel):
-        player: Player = self.player.player
-        can_spin, next_spin = player.can_spin_lucky_wheel(lucky_wheel.cool_down)
-        if not can_spin:
+        player: User = self.player
+        if not player.spin_lucky_wheel(lucky_wheel.cool_down):
+            __, next_spin = player.can_spin_lucky_wheel(lucky_wheel.cool_down)
             raise LuckyWheelCoolDownError(_(f"Player can't spin lucky wheel for {next_spin}."))
         reward = lucky_wheel.spin()
-        player.spin_lucky_wheel()
         self.add_reward_package(reward, 'Lucky wheel')
         return reward
 
@@ -146,13 +148,28 @@ class PlayerWallet(BaseModel):
             wallet.add_reward_package(init_package, "Initiation.")
 
     def current_asset(self, asset_type: AssetType) -> 'AssetOwnership':
+        current_assets = getattr(self, 'current_assets', None)
+        if current_assets is not None:
+            return next((ownership for ownership in current_assets if ownership.asset.type == asset_type), None)
         return self.asset_ownerships.filter(asset__type=asset_type, is_current=True).first()
 
+    @staticmethod
+    def prefetch_current_assets(wallet_lookup: str) -> Prefetch:
+        return Prefetch(f'{wallet_lookup}__asset_ownerships', to_attr='current_assets',
+                        queryset=AssetOwnership.objects.filter(is_current=True).select_related('asset'))
+
+    @staticmethod
+    def current_avatars(player_ids) -> dict:
+        ownerships = AssetOwnership.objects.filter(wallet__player_id__in=player_ids, is_current=True,
+                                                   asset__type=AssetType.AVATAR) \
+            .values_list('wallet__player_id', 'asset_id', 'asset__config')
+        return {player_id: {'id': asset_id, 'config': config} for player_id, asset_id, config in ownerships}
+
     def set_avatar(self, asset_ownership: 'AssetOwnership') -> 'PlayerWallet':
         if asset_ownership.asset.type != AssetType.AVATAR:
             raise InvalidAvatarError(_(f"Selected asset should be {AssetType.AVATAR} not {asset_ownership.asset.type}"))
         asset_ownership.set_current()
-        self.player.cache_user()
+        self.player.reset_current_avatar()
         return self
 
 
@@ -185,7 +202,8 @@ class AssetOwnership(models.Model):
 
     def save(self, *args, **kwargs):
         if self.is_current:
-            self.__class__.objects.filter(asset__type=self.asset.type).exclude(id=self.id).update(is_current=False)
+            self.__class__.objects.filter(wallet_id=self.wallet_id, asset__type=self.asset.type) \
+                .exclude(id=self.id).update(is_current=False)
         super(AssetOwnership, self).save(*args, **kwargs)
 
     def set_current(self):
@@ -226,3 +244,14 @@ def normal_player_post_save_signal(sender, instance, created, **kwargs):
 def guest_post_save_signal(sender, instance, created, **kwargs):
     if created:
         PlayerWallet.initialize(instance)
+
+
+@receiver(signal=post_save, sender=AssetOwnership)
+@receiver(signal=post_delete, sender=AssetOwnership)
+def asset_ownership_changed_signal(sender, instance, **kwargs):
+    if not instance.is_current or instance.asset.type != AssetType.AVATAR:
+        return
+    player = User.objects.filter(shop_info__id=instance.wallet_id).first()
+    if player:
+        player.reset_current_avatar()
+        player.cache_user()
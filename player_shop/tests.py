@@ -1,3 +1,6 @@
+import json
+
+from django.conf import settings
 from django.test import TestCase
 from django.urls import reverse
 from django.utils import timezone
@@ -36,7 +39,7 @@ class PlayerWalletViewSetTests(APITestCase):
             profile_name='TestUser'
         )
         self.user.is_verified = True
-        self.user.save()
+        self.user.save(update_fields=['is_verified'])
 
         self.other_user = NormalPlayer.objects.create_user(
             email='other@example.com',
@@ -44,7 +47,7 @@ class PlayerWalletViewSetTests(APITestCase):
             profile_name='OtherUser'
         )
         self.other_user.is_verified = True
-        self.other_user.save()
+        self.other_user.save(update_fields=['is_verified'])
 
         self.guest_user = GuestPlayer.objects.create_user(
             device_id='guest-device-123',
@@ -251,6 +254,26 @@ class PlayerWalletViewSetTests(APITestCase):
         self.assertTrue(self.user_avatar2.is_current)
         self.assertFalse(self.user_avatar1.is_current)
 
+    def test_setting_avatar_refreshes_cache_and_keeps_other_players_avatars(self):
+        """Setting an avatar should republish the player cache without touching other wallets"""
+        other_avatar = AssetOwnership.objects.create(
+            wallet=self.other_user.shop_info,
+            asset=self.avatar1,
+            is_current=True
+        )
+        self.client.force_authenticate(user=self.user)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(
+                reverse('wallet-asset-set-avatar', kwargs={'asset_ownership': self.user_avatar2.id})
+            )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        cached = json.loads(settings.REDIS_CLIENT.hget('USERS', self.user.id))
+        self.assertEqual(cached['avatar']['id'], self.avatar2.id)
+        other_avatar.refresh_from_db()
+        self.assertTrue(other_avatar.is_current)
+
     def test_user_cannot_set_avatar_from_non_owned_asset(self):
         """Users should not be able to set avatar from assets they don't own"""
         # Create asset owned by other user
@@ -351,7 +374,7 @@ class PlayerWalletViewSetTests(APITestCase):
             password='password123'
         )
         empty_user.is_verified = True
-        empty_user.save()
+        empty_user.save(update_fields=['is_verified'])
 
         self.client.force_authenticate(user=empty_user)
 
@@ -367,7 +390,7 @@ class PlayerWalletViewSetTests(APITestCase):
             password='password123'
         )
         empty_user.is_verified = True
-        empty_user.save()
+        empty_user.save(update_fields=['is_verified'])
 
         self.client.force_authenticate(user=empty_user)
 
@@ -430,7 +453,7 @@ class PlayerDailyRewardViewSetTests(APITestCase):
             profile_name='TestUser'
         )
         self.user.is_verified = True
-        self.user.save()
+        self.user.save(update_fields=['is_verified'])
 
         self.other_user = NormalPlayer.objects.create_user(
             email='other@example.com',
@@ -438,7 +461,7 @@ class PlayerDailyRewardViewSetTests(APITestCase):
             profile_name='OtherUser'
         )
         self.other_user.is_verified = True
-        self.other_user.save()
+        self.other_user.save(update_fields=['is_verified'])
 
         self.guest_user = GuestPlayer.objects.create_user(
             device_id='guest-device-123',
@@ -1,8 +1,8 @@
-from rest_framework.routers import DefaultRouter
+from rest_framework.routers import SimpleRouter
 
 from player_shop.views import PlayerWalletViewSet, PlayerDailyRewardViewSet
 
-router = DefaultRouter()
+router = SimpleRouter()
 
 router.register('player_shop/wallet', PlayerWalletViewSet, basename='wallet')
 router.register('player_shop/daily_reward', PlayerDailyRewardViewSet, basename='daily-reward')
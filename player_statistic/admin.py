@@ -6,11 +6,14 @@ from player_statistic.models import PlayerLevel, PlayerStatistic
 @admin.register(PlayerLevel)
 class PlayerLevelAdmin(admin.ModelAdmin):
     list_display = ('start_xp', 'index', 'reward', )
+    list_select_related = ('reward', )
 
 
 @admin.register(PlayerStatistic)
 class PlayerStatisticAdmin(admin.ModelAdmin):
     list_display = ('player', 'level', 'xp', 'score', 'cup', )
+    list_select_related = ('player', 'level', )
     raw_id_fields = ('player', )
+    show_full_result_count = False
     search_fields = ('player__username', )
     
\ No newline at end of file
@@ -19,7 +19,7 @@ class PlayerLevelViewSetTests(APITestCase):
             password='password123'
         )
         self.user.is_verified = True
-        self.user.save()
+        self.user.save(update_fields=['is_verified'])
 
         # Create reward packages for levels
         self.level1_reward = RewardPackage.objects.create(
@@ -126,8 +126,7 @@ class PlayerLevelViewSetTests(APITestCase):
     def test_player_levels_are_paginated(self):
         """Player levels list should support pagination"""
         # Create many player levels
-        for i in range(25):
-            PlayerLevel.objects.create(start_xp=1000 + (i * 100))
+        PlayerLevel.objects.bulk_create([PlayerLevel(start_xp=1000 + (i * 100)) for i in range(25)])
 
         self.client.force_authenticate(user=self.user)
         response = self.client.get(reverse('player-level-list'))
@@ -183,7 +182,7 @@ class PlayerStatisticViewSetTests(APITestCase):
             profile_name='TestUser'
         )
         self.user.is_verified = True
-        self.user.save()
+        self.user.save(update_fields=['is_verified'])
 
         self.other_user = NormalPlayer.objects.create_user(
             email='other@example.com',
@@ -191,7 +190,7 @@ class PlayerStatisticViewSetTests(APITestCase):
             profile_name='OtherUser'
         )
         self.other_user.is_verified = True
-        self.other_user.save()
+        self.other_user.save(update_fields=['is_verified'])
 
         self.guest_user = GuestPlayer.objects.create_user(
             device_id='guest-device-123',
@@ -1,8 +1,8 @@
-from rest_framework.routers import DefaultRouter
+from rest_framework.routers import SimpleRouter
 
 from player_statistic.views import PlayerStatisticViewSet, PlayerLevelViewSet
 
-router = DefaultRouter()
+router = SimpleRouter()
 
 router.register('player_statistic', PlayerStatisticViewSet, basename='player-statistic')
 router.register('player_level', PlayerLevelViewSet, basename='player-level')
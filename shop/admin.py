@@ -28,6 +28,7 @@ class CurrencyAdmin(admin.ModelAdmin, DisplayThumbnailAdmin):
 class ShopPackageAdmin(admin.ModelAdmin, DisplayThumbnailAdmin):
     list_display = ['name', 'price_currency', 'price_amount', 'is_in_discount', 'final_price', 'display_thumbnail', ]
     list_filter = ['shop_section', 'markets', 'is_active', ]
+    list_select_related = ['price_currency', ]
     search_fields = ['name', 'sku', ]
     filter_horizontal = ['currency_items', 'asset_items', 'markets', ]
 
@@ -44,6 +45,7 @@ class RewardPackageAdmin(admin.ModelAdmin, DisplayThumbnailAdmin):
 class CurrencyPackageItemAdmin(admin.ModelAdmin):
     list_display = ['currency', 'amount', 'is_active', ]
     list_filter = ['currency']
+    list_select_related = ['currency', ]
 
 
 @admin.register(Asset)
@@ -83,6 +85,7 @@ class ShopSectionAdmin(admin.ModelAdmin):
 class CostAdmin(admin.ModelAdmin):
     list_display = ['currency', 'amount', 'is_active', ]
     list_filter = ['currency', 'is_active', ]
+    list_select_related = ['currency', ]
 
 
 @admin.register(ShopConfiguration)
@@ -93,6 +96,7 @@ class ShopConfigurationAdmin(admin.ModelAdmin):
 @admin.register(DailyRewardPackage)
 class DailyRewardPackageAdmin(admin.ModelAdmin):
     list_display = ['day_number', 'reward', 'is_active', ]
+    list_select_related = ['reward', ]
 
 
 class LuckyWheelSectionInline(admin.TabularInline):
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.4 on 2026-10-16 19:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('shop', '0003_asset_image'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='shoppackage',
+            index=models.Index(fields=['shop_section', 'is_active'], name='shop_shoppa_shop_se_af7ce9_idx'),
+        ),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 5.2.4 on 2026-10-16 19:47
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('shop', '0004_shoppackage_section_active_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ShopPackageSnapshot',
+            fields=[
+                ('package', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='snapshot', serialize=False, to='shop.shoppackage', verbose_name='Package')),
+                ('payload', models.JSONField(verbose_name='Payload')),
+                ('rendered_time', models.DateTimeField(auto_now=True, verbose_name='Rendered Time')),
+            ],
+            options={
+                'verbose_name': 'Shop Package Snapshot',
+                'verbose_name_plural': 'Shop Package Snapshots',
+            },
+        ),
+    ]
@@ -1,10 +1,12 @@
 import math
 import random
 from datetime import timedelta
+from typing import Union
 
+from django.core.cache import cache
 from django.core.validators import MinValueValidator, MaxValueValidator
 from django.db import models
-from django.db.models import Sum
+from django.db.models import Sum, F, Window, Min, Q
 from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 from imagekit.models.fields import ImageSpecField
@@ -187,10 +189,72 @@ class ShopPackage(Package):
     def is_in_app_purchase(self):
         return self.price_currency.type == Currency.CurrencyType.IN_APP
 
+    @classmethod
+    def get_catalog_version_key(cls):
+        return f'{cls.__name__.upper()}_CATALOG_VERSION'
+
+    @classmethod
+    def get_catalog_version(cls) -> int:
+        return cache.get_or_set(cls.get_catalog_version_key(), 1, None)
+
+    @classmethod
+    def bump_catalog_version(cls):
+        try:
+            cache.incr(cls.get_catalog_version_key())
+        except ValueError:
+            cache.set(cls.get_catalog_version_key(), 1, None)
+
+    @classmethod
+    def get_next_discount_boundary(cls) -> int:
+        """Timestamp of the next discount start or end, cached until it passes or the catalog changes."""
+        version = cls.get_catalog_version()
+        key = f'{cls.__name__.upper()}_DISCOUNT_BOUNDARY:{version}'
+        boundary = cache.get(key)
+        if boundary is not None:
+            return boundary
+        now = timezone.now()
+        state = cls.objects.filter(is_active=True).aggregate(
+            next_start=Min('discount_start', filter=Q(discount_start__gte=now)),
+            next_end=Min('discount_end', filter=Q(discount_end__gte=now)),
+        )
+        upcoming = [moment for moment in state.values() if moment is not None]
+        if not upcoming:
+            cache.set(key, 0, None)
+            return 0
+        boundary = math.ceil(min(upcoming).timestamp())
+        cache.set(key, boundary, max(1, boundary - math.floor(now.timestamp())))
+        return boundary
+
+    @classmethod
+    def get_catalog_cache_key(cls, market_id, section, page):
+        return f'shop:pkgs:{cls.get_catalog_version()}:{cls.get_next_discount_boundary()}:{market_id}:{section}:{page}'
+
     class Meta:
         verbose_name = _("Shop Package")
         verbose_name_plural = _("Shop Packages")
         ordering = ('priority',)
+        indexes = [
+            models.Index(fields=['shop_section', 'is_active']),
+        ]
+
+
+class ShopPackageSnapshot(models.Model):
+    package = models.OneToOneField(to=ShopPackage, verbose_name=_("Package"), on_delete=models.CASCADE,
+                                   primary_key=True, related_name='snapshot')
+    payload = models.JSONField(verbose_name=_("Payload"))
+    rendered_time = models.DateTimeField(verbose_name=_("Rendered Time"), auto_now=True)
+
+    def __str__(self):
+        return f'{self.package} snapshot'
+
+    @classmethod
+    def invalidate(cls, packages):
+        cls.objects.filter(package__in=packages).delete()
+        ShopPackage.bump_catalog_version()
+
+    class Meta:
+        verbose_name = _("Shop Package Snapshot")
+        verbose_name_plural = _("Shop Package Snapshots")
 
 
 class RewardPackage(Package):
@@ -238,6 +302,14 @@ class LuckyWheel(BaseModel):
     name = models.CharField(verbose_name=_("Name"), max_length=255, default="Wheel of fortune")
     cool_down = models.DurationField(verbose_name=_('Cool down'), default=timedelta(days=1))
 
+    @classmethod
+    def get_active_cache_key(cls):
+        return f'{cls.__name__.lower()}:active'
+
+    @classmethod
+    def clear_active_cache(cls):
+        cache.delete(cls.get_active_cache_key())
+
     @property
     def accumulated_chance(self) -> int:
         return self.sections.filter(is_active=True).aggregate(Sum('chance'))['chance__sum']
@@ -246,18 +318,18 @@ class LuckyWheel(BaseModel):
     def sections_count(self) -> int:
         return self.sections.filter(is_active=True).count()
 
+    def pick_section(self) -> Union['LuckyWheelSection', None]:
+        sections = self.sections.filter(is_active=True, chance__gt=0).annotate(
+            accumulated_chance=Window(Sum('chance'), order_by=F('id').asc()),
+            total_chance=Window(Sum('chance')),
+        )
+        return sections.filter(accumulated_chance__gt=F('total_chance') * random.random()) \
+            .select_related('package').order_by('id').first()
+
     def spin(self) -> 'RewardPackage':
-        if self.sections_count < 1:
+        selected_section = self.pick_section()
+        if selected_section is None:
             raise EmptyLuckyWheelError(_("Lucky Wheel is empty."))
-        
-        sections = self.sections.filter(is_active=True).select_related("package")
-        weighted_sections = [(section, section.chance) for section in sections]
-
-        selected_section = random.choices(
-            population=[section for section, __ in weighted_sections],
-            weights=[weight for __, weight in weighted_sections],
-            k=1
-        )[0]
         return selected_section.package
 
     def __str__(self):
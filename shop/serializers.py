@@ -1,5 +1,6 @@
 from rest_framework import serializers
 
+from common.serializers import CachedFieldsSerializerMixin
 from shop.models import ShopPackage, Currency, ShopSection, CurrencyPackageItem, Asset, Market, DailyRewardPackage, \
     RewardPackage, LuckyWheel, LuckyWheelSection, Cost
 
@@ -30,7 +31,7 @@ class AssetItemSerializer(serializers.ModelSerializer):
         fields = ['id', 'name', 'config', 'type']
 
 
-class ShopPackageSerializer(serializers.ModelSerializer):
+class ShopPackageSerializer(CachedFieldsSerializerMixin, serializers.ModelSerializer):
     has_discount = serializers.SerializerMethodField()
     shop_section = serializers.SerializerMethodField()
     price_currency = CurrencySerializer()
@@ -42,6 +43,22 @@ class ShopPackageSerializer(serializers.ModelSerializer):
         fields = ['id', 'price_currency', 'discount', 'discount_start', 'discount_end', 'shop_section', 'sku',
                   'has_discount', 'name', 'currency_items', 'asset_items', 'image']
 
+    @staticmethod
+    def with_absolute_urls(payload: dict, request) -> dict:
+        """Snapshots are rendered without a request, so their media urls are resolved against it on read."""
+        def absolute(url):
+            return request.build_absolute_uri(url) if url else url
+
+        def currency(data):
+            return {**data, 'icon': absolute(data['icon'])} if data else data
+
+        return {
+            **payload,
+            'image': absolute(payload['image']),
+            'price_currency': currency(payload['price_currency']),
+            'currency_items': [{**item, 'currency': currency(item['currency'])} for item in payload['currency_items']],
+        }
+
     @staticmethod
     def get_has_discount(obj: ShopPackage):
         return obj.is_in_discount()
@@ -0,0 +1,78 @@
+from django.db import transaction
+from django.db.models import Q
+from django.db.models.signals import post_save, post_delete, pre_delete, m2m_changed
+from django.dispatch import receiver
+
+from shop.models import ShopPackage, LuckyWheel, LuckyWheelSection, RewardPackage, ShopPackageSnapshot, Currency, \
+    CurrencyPackageItem, Asset, ShopSection
+from shop.tasks import render_missing_shop_package_snapshots_task
+
+
+def _invalidate_snapshots(package_ids):
+    package_ids = list(package_ids)
+    transaction.on_commit(lambda: ShopPackageSnapshot.invalidate(package_ids))
+    transaction.on_commit(render_missing_shop_package_snapshots_task.delay, robust=True)
+
+
+@receiver(signal=post_save, sender=ShopPackage)
+def shop_package_saved(sender, instance, **kwargs):
+    _invalidate_snapshots([instance.pk])
+
+
+@receiver(signal=post_delete, sender=ShopPackage)
+def shop_package_deleted(sender, instance, **kwargs):
+    transaction.on_commit(ShopPackage.bump_catalog_version)
+
+
+@receiver(signal=m2m_changed, sender=ShopPackage.markets.through)
+def shop_package_markets_changed(sender, instance, action, **kwargs):
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        transaction.on_commit(ShopPackage.bump_catalog_version)
+
+
+@receiver(signal=m2m_changed, sender=ShopPackage.currency_items.through)
+@receiver(signal=m2m_changed, sender=ShopPackage.asset_items.through)
+def shop_package_items_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if not reverse:
+        _invalidate_snapshots([instance.pk])
+    elif pk_set:
+        _invalidate_snapshots(pk_set)
+    else:
+        _invalidate_snapshots(ShopPackage.objects.values_list('id', flat=True))
+
+
+@receiver(signal=post_save, sender=Currency)
+@receiver(signal=pre_delete, sender=Currency)
+def currency_changed(sender, instance, **kwargs):
+    _invalidate_snapshots(ShopPackage.objects.filter(
+        Q(price_currency=instance) | Q(currency_items__currency=instance)
+    ).values_list('id', flat=True))
+
+
+@receiver(signal=post_save, sender=CurrencyPackageItem)
+@receiver(signal=pre_delete, sender=CurrencyPackageItem)
+def currency_package_item_changed(sender, instance, **kwargs):
+    _invalidate_snapshots(ShopPackage.objects.filter(currency_items=instance).values_list('id', flat=True))
+
+
+@receiver(signal=post_save, sender=Asset)
+@receiver(signal=pre_delete, sender=Asset)
+def asset_changed(sender, instance, **kwargs):
+    _invalidate_snapshots(ShopPackage.objects.filter(asset_items=instance).values_list('id', flat=True))
+
+
+@receiver(signal=post_save, sender=ShopSection)
+@receiver(signal=pre_delete, sender=ShopSection)
+def shop_section_changed(sender, instance, **kwargs):
+    _invalidate_snapshots(ShopPackage.objects.filter(shop_section=instance).values_list('id', flat=True))
+
+
+@receiver(signal=post_save, sender=LuckyWheel)
+@receiver(signal=post_delete, sender=LuckyWheel)
+@receiver(signal=post_save, sender=LuckyWheelSection)
+@receiver(signal=post_delete, sender=LuckyWheelSection)
+@receiver(signal=post_save, sender=RewardPackage)
+def lucky_wheel_changed(sender, instance, **kwargs):
+    LuckyWheel.clear_active_cache()
@@ -0,0 +1,27 @@
+from celery import shared_task
+
+from shop.models import ShopPackage, ShopPackageSnapshot
+from shop.serializers import ShopPackageSerializer
+
+
+def serialize_shop_packages(package_ids) -> dict:
+    packages = ShopPackage.objects.filter(id__in=package_ids) \
+        .select_related('price_currency', 'shop_section') \
+        .prefetch_related('currency_items__currency', 'asset_items')
+    return {package.id: ShopPackageSerializer(package).data for package in packages}
+
+
+def render_shop_package_snapshots(package_ids) -> dict:
+    payloads = serialize_shop_packages(package_ids)
+    ShopPackageSnapshot.objects.bulk_create(
+        [ShopPackageSnapshot(package_id=package_id, payload=payload) for package_id, payload in payloads.items()],
+        update_conflicts=True, unique_fields=['package'], update_fields=['payload', 'rendered_time'],
+    )
+    return payloads
+
+
+@shared_task
+def render_missing_shop_package_snapshots_task():
+    package_ids = ShopPackage.objects.filter(is_active=True, snapshot__isnull=True).values_list('id', flat=True)
+    if render_shop_package_snapshots(list(package_ids)):
+        ShopPackage.bump_catalog_version()
@@ -1,4 +1,7 @@
-from django.test import TestCase
+from django.conf import settings
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from django.utils import timezone
 from django.core.cache import cache
@@ -6,13 +9,16 @@ from rest_framework.test import APITestCase
 from rest_framework import status
 from datetime import timedelta
 from decimal import Decimal
+from unittest.mock import patch
 
 from user.models import NormalPlayer
 from shop.models import (
-    Market, ShopPackage, Currency, ShopSection, CurrencyPackageItem,
-    DailyRewardPackage, RewardPackage, LuckyWheel, LuckyWheelSection, Cost, ShopConfiguration
+    Market, ShopPackage, Currency, Asset, ShopSection, CurrencyPackageItem,
+    DailyRewardPackage, RewardPackage, LuckyWheel, LuckyWheelSection, Cost, ShopConfiguration,
+    ShopPackageSnapshot
 )
 from player_shop.models import PlayerWallet, CurrencyBalance
+from shop.tasks import render_missing_shop_package_snapshots_task
 
 
 class MarketViewSetTests(APITestCase):
@@ -25,7 +31,7 @@ class MarketViewSetTests(APITestCase):
             password='password123'
         )
         self.user.is_verified = True
-        self.user.save()
+        self.user.save(update_fields=['is_verified'])
 
         # Create test markets
         self.active_market = Market.objects.create(
@@ -78,8 +84,7 @@ class MarketViewSetTests(APITestCase):
     def test_markets_are_paginated(self):
         """Markets list should support pagination"""
         # Create many markets
-        for i in range(25):
-            Market.objects.create(name=f'Market {i}', is_active=True)
+        Market.objects.bulk_create([Market(name=f'Market {i}', is_active=True) for i in range(25)])
 
         self.client.force_authenticate(user=self.user)
         response = self.client.get(reverse('market-list'))
@@ -99,7 +104,7 @@ class ShopViewSetTests(APITestCase):
             password='password123'
         )
         self.user.is_verified = True
-        self.user.save()
+        self.user.save(update_fields=['is_verified'])
 
         self.initial_package = RewardPackage.objects.create(
             name='Initial Package',
@@ -163,6 +168,10 @@ class ShopViewSetTests(APITestCase):
         )
         self.other_market_package.markets.add(other_market)
 
+        delay_patcher = patch('shop.signals.render_missing_shop_package_snapshots_task.delay')
+        delay_patcher.start()
+        self.addCleanup(delay_patcher.stop)
+
     def test_authenticated_user_can_list_shop_packages_for_their_market(self):
         """Users should only see packages available in their market"""
         self.client.force_authenticate(user=self.user)
@@ -197,6 +206,132 @@ class ShopViewSetTests(APITestCase):
         self.assertIn('Coin Pack', package_names)
         self.assertNotIn('Basic Pack', package_names)
 
+    def test_invalid_section_filter_is_ignored(self):
+        """Non integer section values should fall back to the unfiltered list"""
+        self.client.force_authenticate(user=self.user)
+
+        response = self.client.get(reverse('shop-list'), {'section': '²'})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        package_names = [pkg['name'] for pkg in response.data['results']]
+        self.assertIn('Coin Pack', package_names)
+
+    def test_listing_packages_leaves_snapshots_to_the_render_task(self):
+        """Listing should serialize packages without snapshots live and only the task should store them"""
+        self.client.force_authenticate(user=self.user)
+
+        response = self.client.get(reverse('shop-list'))
+
+        self.assertIn('Coin Pack', [pkg['name'] for pkg in response.data['results']])
+        self.assertFalse(ShopPackageSnapshot.objects.exists())
+        render_missing_shop_package_snapshots_task()
+        snapshot = ShopPackageSnapshot.objects.get(package=self.in_app_package)
+        self.assertEqual(snapshot.payload['name'], 'Coin Pack')
+
+    def test_snapshots_are_invalidated_after_commit(self):
+        """A snapshot and the catalog version should stay untouched until the change commits"""
+        render_missing_shop_package_snapshots_task()
+        version = ShopPackage.get_catalog_version()
+
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.in_app_currency.name = 'Diamonds'
+            self.in_app_currency.save()
+            self.assertTrue(ShopPackageSnapshot.objects.filter(package=self.in_app_package).exists())
+            self.assertEqual(ShopPackage.get_catalog_version(), version)
+        for callback in callbacks:
+            callback()
+
+        self.assertFalse(ShopPackageSnapshot.objects.filter(package=self.in_app_package).exists())
+        self.assertGreater(ShopPackage.get_catalog_version(), version)
+
+    def test_currency_update_refreshes_package_snapshots(self):
+        """Changing a nested currency should invalidate the snapshots of its packages"""
+        self.client.force_authenticate(user=self.user)
+        render_missing_shop_package_snapshots_task()
+        self.client.get(reverse('shop-list'))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.in_app_currency.name = 'Diamonds'
+            self.in_app_currency.save()
+        response = self.client.get(reverse('shop-list'))
+
+        package = next(pkg for pkg in response.data['results'] if pkg['name'] == 'Coin Pack')
+        self.assertEqual(package['price_currency']['name'], 'Diamonds')
+
+    def test_deleting_asset_and_section_refreshes_package_snapshots(self):
+        """Deleted assets and sections should not linger in package snapshots or cached pages"""
+        asset = Asset.objects.create(name='Golden Frame')
+        self.in_app_package.asset_items.add(asset)
+        render_missing_shop_package_snapshots_task()
+        self.client.force_authenticate(user=self.user)
+        self.client.get(reverse('shop-list'))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            asset.delete()
+            self.section.delete()
+        render_missing_shop_package_snapshots_task()
+        response = self.client.get(reverse('shop-list'))
+
+        package = next(pkg for pkg in response.data['results'] if pkg['name'] == 'Coin Pack')
+        self.assertEqual(package['asset_items'], [])
+        self.assertIsNone(package['shop_section'])
+        snapshot = ShopPackageSnapshot.objects.get(package=self.in_app_package)
+        self.assertEqual(snapshot.payload['asset_items'], [])
+        self.assertIsNone(snapshot.payload['shop_section'])
+
+    def test_discount_flag_is_computed_on_read(self):
+        """Snapshots should not freeze the discount flag"""
+        self.client.force_authenticate(user=self.user)
+        self.client.get(reverse('shop-list'))
+        ShopPackage.objects.filter(id=self.in_app_package.id).update(
+            discount=0.5,
+            discount_start=timezone.now() - timedelta(days=1),
+            discount_end=timezone.now() + timedelta(days=1),
+        )
+        ShopPackage.bump_catalog_version()
+
+        response = self.client.get(reverse('shop-list'))
+
+        package = next(pkg for pkg in response.data['results'] if pkg['name'] == 'Coin Pack')
+        self.assertTrue(package['has_discount'])
+
+    def test_cached_discount_flag_expires_when_discount_starts(self):
+        """A cached page should not keep serving the discount flag past the discount start"""
+        start = timezone.now() + timedelta(minutes=30)
+        self.in_app_package.discount = 0.5
+        self.in_app_package.discount_start = start
+        self.in_app_package.discount_end = start + timedelta(days=1)
+        self.in_app_package.save()
+        self.client.force_authenticate(user=self.user)
+
+        response = self.client.get(reverse('shop-list'))
+        package = next(pkg for pkg in response.data['results'] if pkg['name'] == 'Coin Pack')
+        self.assertFalse(package['has_discount'])
+
+        later = start + timedelta(minutes=1)
+        with patch('django.utils.timezone.now', return_value=later), \
+                patch('time.time', return_value=later.timestamp()):
+            response = self.client.get(reverse('shop-list'))
+
+        package = next(pkg for pkg in response.data['results'] if pkg['name'] == 'Coin Pack')
+        self.assertTrue(package['has_discount'])
+
+    @override_settings(STORAGES={**settings.STORAGES,
+                                 'default': {'BACKEND': 'django.core.files.storage.FileSystemStorage'}})
+    def test_listed_package_images_match_package_details(self):
+        """Snapshot media urls should be served as absolute urls, like the package detail"""
+        ShopPackage.objects.filter(id=self.in_app_package.id).update(image='package/coin.png')
+        Currency.objects.filter(id=self.in_app_currency.id).update(icon='currencies/coin.png')
+        self.client.force_authenticate(user=self.user)
+
+        response = self.client.get(reverse('shop-list'))
+        detail = self.client.get(reverse('shop-detail', kwargs={'pk': self.in_app_package.id}))
+
+        package = next(pkg for pkg in response.data['results'] if pkg['name'] == 'Coin Pack')
+        self.assertTrue(package['image'].startswith('http://testserver/'))
+        self.assertEqual(package['image'], detail.data['image'])
+        self.assertEqual(package['price_currency']['icon'], detail.data['price_currency']['icon'])
+
     def test_user_can_retrieve_package_details_from_their_market(self):
         """Users should be able to view details of packages in their market"""
         self.client.force_authenticate(user=self.user)
@@ -253,6 +388,19 @@ class ShopViewSetTests(APITestCase):
         self.assertFalse(response.data['success'])
         self.assertIn('error', response.data)
 
+    def test_repeated_purchase_cannot_overdraw_balance(self):
+        """Purchases should only deduct currency while the balance covers the price"""
+        CurrencyBalance.objects.filter(wallet=self.wallet, currency=self.in_app_currency).update(balance=150)
+        self.client.force_authenticate(user=self.user)
+
+        first = self.client.post(reverse('shop-purchase', kwargs={'pk': self.in_app_package.id}))
+        second = self.client.post(reverse('shop-purchase', kwargs={'pk': self.in_app_package.id}))
+
+        self.assertEqual(first.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(second.status_code, status.HTTP_402_PAYMENT_REQUIRED)
+        currency_balance = CurrencyBalance.objects.get(wallet=self.wallet, currency=self.in_app_currency)
+        self.assertEqual(currency_balance.balance, 50)
+
     def test_user_cannot_purchase_real_money_package_through_purchase_endpoint(self):
         """Real money packages should not be purchasable through regular purchase endpoint"""
         self.client.force_authenticate(user=self.user)
@@ -297,6 +445,112 @@ class ShopViewSetTests(APITestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertTrue(response.data['has_discount'])
 
+    def test_shop_list_sets_revalidation_headers(self):
+        """Shop list should be cacheable by shared caches and carry an ETag"""
+        self.client.force_authenticate(user=self.user)
+
+        response = self.client.get(reverse('shop-list'))
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn('ETag', response)
+        self.assertIn('public', response['Cache-Control'])
+        self.assertIn('proxy-revalidate', response['Cache-Control'])
+        self.assertIn('Authorization', response['Vary'])
+
+    def test_shop_list_returns_not_modified_for_matching_etag(self):
+        """Clients sending a fresh ETag should get a 304 without a body"""
+        self.client.force_authenticate(user=self.user)
+        etag = self.client.get(reverse('shop-list'))['ETag']
+
+        response = self.client.get(reverse('shop-list'), HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_shop_list_etag_changes_when_package_is_updated(self):
+        """Updating a package should invalidate the previous ETag"""
+        self.client.force_authenticate(user=self.user)
+        etag = self.client.get(reverse('shop-list'))['ETag']
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.in_app_package.price_amount = 150
+            self.in_app_package.save()
+        response = self.client.get(reverse('shop-list'), HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_shop_list_etag_changes_when_nested_currency_is_updated(self):
+        """Renaming a package currency should invalidate the previous ETag"""
+        self.client.force_authenticate(user=self.user)
+        etag = self.client.get(reverse('shop-list'))['ETag']
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.in_app_currency.name = 'Diamonds'
+            self.in_app_currency.save()
+        response = self.client.get(reverse('shop-list'), HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_shop_list_etag_changes_when_discount_starts(self):
+        """An opening discount window should invalidate the previous ETag"""
+        start = timezone.now() + timedelta(minutes=30)
+        self.in_app_package.discount = 0.5
+        self.in_app_package.discount_start = start
+        self.in_app_package.discount_end = start + timedelta(days=1)
+        self.in_app_package.save()
+        self.client.force_authenticate(user=self.user)
+        etag = self.client.get(reverse('shop-list'))['ETag']
+
+        later = start + timedelta(minutes=1)
+        with patch('django.utils.timezone.now', return_value=later), \
+                patch('time.time', return_value=later.timestamp()):
+            response = self.client.get(reverse('shop-list'), HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_shop_sections_returns_not_modified_for_matching_etag(self):
+        """Shop sections should support conditional requests"""
+        self.client.force_authenticate(user=self.user)
+        etag = self.client.get(reverse('shop-section'))['ETag']
+
+        response = self.client.get(reverse('shop-section'), HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_shop_list_reflects_new_packages_after_cache_is_warm(self):
+        """Cached shop pages should be invalidated when the catalog changes"""
+        self.client.force_authenticate(user=self.user)
+        self.client.get(reverse('shop-list'))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            new_package = ShopPackage.objects.create(
+                name='Fresh Pack',
+                price_currency=self.in_app_currency,
+                price_amount=10,
+                sku='fresh_pack_001'
+            )
+            new_package.markets.add(self.market)
+        response = self.client.get(reverse('shop-list'))
+
+        package_names = [pkg['name'] for pkg in response.data['results']]
+        self.assertIn('Fresh Pack', package_names)
+
+    def test_shop_list_caches_sections_separately(self):
+        """Section filtered pages should not be served from the unfiltered cache entry"""
+        other_section = ShopSection.objects.create(name='Basic Packages')
+        self.client.force_authenticate(user=self.user)
+        self.client.get(reverse('shop-list'))
+
+        response = self.client.get(reverse('shop-list'), {'section': other_section.id})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data['results']), 0)
+
+    def tearDown(self):
+        """Clear cache after each test to avoid caching issues"""
+        cache.clear()
+
     # def test_shop_verify_endpoint_exists(self):
     #     """Shop verify endpoint should exist (even if not implemented)"""
     #     self.client.force_authenticate(user=self.user)
@@ -317,7 +571,7 @@ class DailyRewardViewSetTests(APITestCase):
             password='password123'
         )
         self.user.is_verified = True
-        self.user.save()
+        self.user.save(update_fields=['is_verified'])
 
         # Create reward packages
         self.day1_reward = RewardPackage.objects.create(
@@ -364,6 +618,23 @@ class DailyRewardViewSetTests(APITestCase):
         self.assertEqual(response.data['results'][0]['day_number'], 1)
         self.assertEqual(response.data['results'][1]['day_number'], 2)
 
+    def test_daily_reward_list_query_count_does_not_grow_with_rewards(self):
+        """Listing daily rewards should prefetch nested reward items"""
+        self.client.force_authenticate(user=self.user)
+        with CaptureQueriesContext(connection) as initial_queries:
+            self.client.get(reverse('daily-reward-list'))
+
+        for day in range(4, 8):
+            reward = RewardPackage.objects.create(name=f'Day {day} Reward',
+                                                  reward_type=RewardPackage.RewardType.DAILY_REWARD)
+            DailyRewardPackage.objects.create(day_number=day, reward=reward)
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('daily-reward-list'))
+
+        self.assertEqual(len(response.data['results']), 6)
+        self.assertEqual(len(queries), len(initial_queries))
+
     def test_unauthenticated_user_cannot_list_daily_rewards(self):
         """Unauthenticated users cannot access daily rewards"""
         response = self.client.get(reverse('daily-reward-list'))
@@ -429,7 +700,7 @@ class LuckyWheelViewSetTests(APITestCase):
             password='password123'
         )
         self.user.is_verified = True
-        self.user.save()
+        self.user.save(update_fields=['is_verified'])
 
         # Create player wallet
         self.wallet, c = PlayerWallet.objects.get_or_create(player=self.user)
@@ -499,6 +770,25 @@ class LuckyWheelViewSetTests(APITestCase):
         self.user.refresh_from_db()
         self.assertIsNotNone(self.user.last_lucky_wheel_spin)
 
+    def test_spin_never_picks_zero_chance_sections(self):
+        """Sections without chance should never be selected by the weighted pick"""
+        self.section2.chance = 0
+        self.section2.save()
+
+        picked = {self.lucky_wheel.spin() for __ in range(20)}
+
+        self.assertEqual(picked, {self.small_reward})
+
+    def test_consecutive_spins_respect_cooldown(self):
+        """A second spin right after the first should hit the cooldown"""
+        self.client.force_authenticate(user=self.user)
+
+        first = self.client.post(reverse('lucky-wheel-spin', kwargs={'pk': self.lucky_wheel.id}))
+        second = self.client.post(reverse('lucky-wheel-spin', kwargs={'pk': self.lucky_wheel.id}))
+
+        self.assertEqual(first.status_code, status.HTTP_200_OK)
+        self.assertEqual(second.status_code, status.HTTP_425_TOO_EARLY)
+
     def test_user_cannot_spin_wheel_during_cooldown(self):
         """Users should not be able to spin the wheel during cooldown period"""
         # Set user's last spin to recent time (within cooldown)
@@ -598,6 +888,31 @@ class LuckyWheelViewSetTests(APITestCase):
         package_names = [section['package']['name'] for section in response.data['sections']]
         self.assertNotIn('Inactive Reward', package_names)
 
+    def test_wheel_list_is_served_from_cache(self):
+        """Repeated lucky wheel list requests should not hit the database"""
+        self.client.force_authenticate(user=self.user)
+        self.client.get(reverse('lucky-wheel-list'))
+
+        with self.assertNumQueries(0):
+            response = self.client.get(reverse('lucky-wheel-list'))
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['name'], 'Fortune Wheel')
+
+    def test_wheel_cache_is_invalidated_on_change(self):
+        """Updating the wheel or its sections should refresh the cached payload"""
+        self.client.force_authenticate(user=self.user)
+        self.client.get(reverse('lucky-wheel-list'))
+
+        self.lucky_wheel.name = 'Renamed Wheel'
+        self.lucky_wheel.save()
+        self.section2.delete()
+
+        response = self.client.get(reverse('lucky-wheel-list'))
+
+        self.assertEqual(response.data['name'], 'Renamed Wheel')
+        self.assertEqual(len(response.data['sections']), 1)
+
     def tearDown(self):
         """Clear cache after each test to avoid caching issues"""
         cache.clear()
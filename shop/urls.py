@@ -1,8 +1,8 @@
-from rest_framework.routers import DefaultRouter
+from rest_framework.routers import SimpleRouter
 
 from shop.views import ShopViewSet, MarketViewSet, LuckyWheelViewSet, DailyRewardViewSet
 
-router = DefaultRouter()
+router = SimpleRouter()
 
 router.register('shop', ShopViewSet, basename='shop')
 router.register('market', MarketViewSet, basename='market')
@@ -1,8 +1,14 @@
-from django.db.models import Q
+import hashlib
+
+from django.core.cache import cache
+from django.db.models import Q, Max, Count, Case, When
 from django.http import Http404
+from django.utils import timezone
 from django.utils.decorators import method_decorator
 from django.utils.translation import gettext_lazy as _
-from django.views.decorators.cache import cache_page
+from django.views.decorators.cache import cache_control
+from django.views.decorators.http import condition
+from django.views.decorators.vary import vary_on_headers
 from rest_framework import mixins, status
 from rest_framework.decorators import action
 from rest_framework.pagination import PageNumberPagination
@@ -15,6 +21,33 @@ from exceptions.shop import WrongShopFlowError, NotEnoughCreditError, EmptyLucky
 from shop.models import Market, ShopPackage, ShopSection, DailyRewardPackage, LuckyWheel
 from shop.serializers import ShopPackageSerializer, ShopSectionSerializer, MarketSerializer, \
     DailyRewardPackageSerializer, LuckyWheelRetrieveSerializer, RewardPackageSerializer
+from shop.tasks import serialize_shop_packages
+
+
+def _make_etag(*parts) -> str:
+    return hashlib.sha1(":".join(str(part) for part in parts).encode()).hexdigest()
+
+
+def _shop_packages_section(request):
+    try:
+        return int(request.GET.get('section'))
+    except (TypeError, ValueError):
+        return None
+
+
+def shop_packages_cache_key(request) -> str:
+    market = request.user.shop_info.player_market
+    page = request.GET.get(PageNumberPagination.page_query_param, 1)
+    return ShopPackage.get_catalog_cache_key(market.id if market else None, _shop_packages_section(request), page)
+
+
+def shop_packages_etag(request, *args, **kwargs):
+    return _make_etag(shop_packages_cache_key(request))
+
+
+def shop_sections_etag(request, *args, **kwargs):
+    state = ShopSection.objects.filter(is_active=True).aggregate(last_update=Max('updated_time'), count=Count('id'))
+    return _make_etag(state['last_update'], state['count'])
 
 
 class MarketViewSet(GenericViewSet, mixins.ListModelMixin, mixins.RetrieveModelMixin):
@@ -23,6 +56,10 @@ class MarketViewSet(GenericViewSet, mixins.ListModelMixin, mixins.RetrieveModelM
     pagination_class = PageNumberPagination
     serializer_class = MarketSerializer
 
+    def list(self, request, *args, **kwargs):
+        rows = self.paginate_queryset(self.get_queryset().values(*self.serializer_class.Meta.fields))
+        return self.get_paginated_response(rows)
+
 
 class ShopViewSet(GenericViewSet, mixins.ListModelMixin, mixins.RetrieveModelMixin):
     queryset = ShopPackage.objects.filter(is_active=True)
@@ -39,28 +76,46 @@ class ShopViewSet(GenericViewSet, mixins.ListModelMixin, mixins.RetrieveModelMix
 
     def get_object(self):
         obj: ShopPackage = super(ShopViewSet, self).get_object()
-        if obj.markets.count() == 0:
-            return obj
         market = self.request.user.shop_info.player_market
-        if market:
-            market = self.request.user.shop_info.player_market
-            is_in_market = obj.markets.filter(id=market.id).exists()
-            if not is_in_market:
-                raise Http404
+        if not market:
+            return obj
+        package_markets = ShopPackage.markets.through.objects.filter(shoppackage_id=obj.id)
+        if package_markets.exists() and not package_markets.filter(market_id=market.id).exists():
+            raise Http404
         return obj
 
+    @method_decorator(cache_control(public=True, s_maxage=view_cache_timeout, proxy_revalidate=True))
+    @method_decorator(vary_on_headers('Authorization'))
+    @method_decorator(condition(etag_func=shop_packages_etag))
     def list(self, request, *args, **kwargs):
-        section: str = self.request.query_params.get('section', None)
-        qs = self.get_queryset()
-        if section and section.isnumeric():
-            qs = qs.filter(shop_section_id=int(section))
-        pagination = self.paginate_queryset(qs)
-        serializer = self.get_serializer(pagination, many=True)
-        response = self.get_paginated_response(serializer.data)
-        return response
+        cache_key = shop_packages_cache_key(request)
+        data = cache.get(cache_key)
+        if data is None:
+            section = _shop_packages_section(request)
+            now = timezone.now()
+            qs = self.get_queryset().annotate(
+                has_discount=Case(When(discount_start__lt=now, discount_end__gt=now, then=True), default=False)
+            )
+            if section is not None:
+                qs = qs.filter(shop_section_id=section)
+            rows = self.paginate_queryset(qs.values_list('id', 'snapshot__payload', 'has_discount'))
+            missing = [package_id for package_id, payload, __ in rows if payload is None]
+            # snapshots are only written by the render task, so a read never races an invalidation.
+            rendered = serialize_shop_packages(missing) if missing else {}
+            results = []
+            for package_id, payload, has_discount in rows:
+                payload = payload if payload is not None else rendered[package_id]
+                results.append({**payload, 'has_discount': has_discount})
+            data = self.get_paginated_response(results).data
+            cache.set(cache_key, data, self.view_cache_timeout)
+        results = [ShopPackageSerializer.with_absolute_urls(payload, request) for payload in data['results']]
+        return Response({**data, 'results': results}, status=status.HTTP_200_OK)
 
     @action(methods=['GET'], url_path='section', url_name='section', detail=False,
             serializer_class=ShopSectionSerializer)
+    @method_decorator(cache_control(public=True, s_maxage=view_cache_timeout, proxy_revalidate=True))
+    @method_decorator(vary_on_headers('Authorization'))
+    @method_decorator(condition(etag_func=shop_sections_etag))
     def sections(self, request, *args, **kwargs):
         sections = ShopSection.objects.filter(is_active=True)
         return Response(data=self.serializer_class(sections, many=True).data, status=status.HTTP_200_OK)
@@ -83,7 +138,9 @@ class ShopViewSet(GenericViewSet, mixins.ListModelMixin, mixins.RetrieveModelMix
 
 
 class DailyRewardViewSet(GenericViewSet, mixins.ListModelMixin, mixins.RetrieveModelMixin):
-    queryset = DailyRewardPackage.objects.filter(is_active=True)
+    queryset = DailyRewardPackage.objects.filter(is_active=True).select_related('reward').prefetch_related(
+        'reward__currency_items__currency', 'reward__asset_items'
+    )
     serializer_class = DailyRewardPackageSerializer
     permission_classes = [IsAuthenticated, ]
     pagination_class = PageNumberPagination
@@ -93,13 +150,19 @@ class LuckyWheelViewSet(GenericViewSet, mixins.ListModelMixin):
     queryset = LuckyWheel.objects.filter(is_active=True)
     permission_classes = [IsAuthenticated, ]
     serializer_class = LuckyWheelRetrieveSerializer
+    view_cache_timeout = 60 * 5
 
     def get_queryset(self):
         return LuckyWheel.objects.filter(is_active=True)
 
     def list(self, request, *args, **kwargs):
-        wheel = self.get_queryset().first()
-        return Response(self.serializer_class(wheel).data, status=status.HTTP_200_OK)
+        cache_key = LuckyWheel.get_active_cache_key()
+        data = cache.get(cache_key)
+        if data is None:
+            wheel = self.get_queryset().first()
+            data = self.serializer_class(wheel).data
+            cache.set(cache_key, data, self.view_cache_timeout)
+        return Response(data, status=status.HTTP_200_OK)
 
     @action(methods=['POST'], url_path='spin', url_name='spin', detail=True)
     def spin(self, request, *args, **kwargs):
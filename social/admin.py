@@ -8,9 +8,15 @@ from social.models import FriendshipRequest, Friendship
 class FriendshipRequestAdmin(admin.ModelAdmin):
     search_fields = ['sender__username', 'receiver__username']
     list_display = ['sender', 'receiver', ]
+    list_select_related = ['sender', 'receiver', ]
     raw_id_fields = ['sender', 'receiver']
+    show_full_result_count = False
 
 
 @admin.register(Friendship)
 class FriendshipAdmin(admin.ModelAdmin):
     search_fields = ['user_1__username', 'user_2__username']
+    list_display = ['user_1', 'user_2', 'created_time', ]
+    list_select_related = ['user_1', 'user_2', ]
+    raw_id_fields = ['user_1', 'user_2']
+    show_full_result_count = False
@@ -0,0 +1,44 @@
+from typing import Iterable, Union
+
+from redis import Redis
+
+
+class FriendCache:
+    TIMEOUT = 60 * 60 * 24
+    # Stored in every loaded set so players without friends are cached too.
+    LOADED_MARKER = 0
+
+    def __init__(self, redis_client: Redis):
+        self._redis = redis_client
+
+    @staticmethod
+    def get_key(user_id: int) -> str:
+        return f'friends:{user_id}'
+
+    def fill(self, user_id: int, friend_ids: Iterable[int]):
+        key = self.get_key(user_id)
+        pipeline = self._redis.pipeline()
+        pipeline.delete(key)
+        pipeline.sadd(key, self.LOADED_MARKER, *friend_ids)
+        pipeline.expire(key, self.TIMEOUT)
+        pipeline.execute()
+
+    def get_friends(self, user_id: int) -> Union[set, None]:
+        members = self._redis.smembers(self.get_key(user_id))
+        if not members:
+            return None
+        return {int(member) for member in members} - {self.LOADED_MARKER}
+
+    def is_friend(self, user_id: int, other_id: int) -> Union[bool, None]:
+        key = self.get_key(user_id)
+        pipeline = self._redis.pipeline()
+        pipeline.exists(key)
+        pipeline.sismember(key, other_id)
+        loaded, is_member = pipeline.execute()
+        if not loaded:
+            return None
+        return bool(is_member)
+
+    def invalidate(self, *user_ids: int):
+        if user_ids:
+            self._redis.delete(*[self.get_key(user_id) for user_id in user_ids])
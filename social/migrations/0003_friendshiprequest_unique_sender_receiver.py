@@ -0,0 +1,28 @@
+# Generated by Django 5.2.4 on 2026-10-16 19:51
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Min
+
+
+def remove_duplicate_requests(apps, schema_editor):
+    FriendshipRequest = apps.get_model('social', 'FriendshipRequest')
+    keep_ids = FriendshipRequest.objects.values('sender', 'receiver').annotate(keep_id=Min('id')) \
+        .values_list('keep_id', flat=True)
+    FriendshipRequest.objects.exclude(id__in=list(keep_ids)).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('social', '0002_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RunPython(remove_duplicate_requests, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='friendshiprequest',
+            constraint=models.UniqueConstraint(fields=('sender', 'receiver'), name='uniq_fr_pair'),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.4 on 2026-10-16 19:58
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('social', '0003_friendshiprequest_unique_sender_receiver'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='friendshiprequest',
+            index=models.Index(fields=['sender', 'id'], name='social_frie_sender__e1b64c_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='friendshiprequest',
+            index=models.Index(fields=['receiver', 'id'], name='social_frie_receive_8def5d_idx'),
+        ),
+    ]
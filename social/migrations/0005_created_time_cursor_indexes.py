@@ -0,0 +1,23 @@
+# Generated by Django 5.2.4 on 2026-10-16 20:00
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('social', '0004_friendshiprequest_sender_receiver_id_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='friendship',
+            index=models.Index(fields=['-created_time', 'id'], name='social_frie_created_512e41_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='friendshiprequest',
+            index=models.Index(fields=['-created_time', 'id'], name='social_frie_created_8dfb5b_idx'),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.4 on 2026-10-16 20:03
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('social', '0005_created_time_cursor_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='friendship',
+            index=models.Index(fields=['user_1', '-created_time'], name='social_frie_user_1__b602b2_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='friendship',
+            index=models.Index(fields=['user_2', '-created_time'], name='social_frie_user_2__d55a52_idx'),
+        ),
+    ]
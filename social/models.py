@@ -1,10 +1,14 @@
 from typing import Union
 
+from django.conf import settings
 from django.db import models
+from django.db.transaction import atomic
 from django.utils.translation import gettext_lazy as _
 
 from common.models import BaseModel
 from exceptions.social import AlreadyFriendError, SelfFriendshipError, ReceiverInvalidError
+from social.friend_cache import FriendCache
+from suji.redis import get_pipeline
 from user.models import User
 
 
@@ -16,14 +20,23 @@ class FriendshipRequest(BaseModel):
         verbose_name = _('Friendship Request')
         verbose_name_plural = _('Friendship Requests')
         ordering = ['created_time', ]
+        constraints = [
+            models.UniqueConstraint(fields=['sender', 'receiver'], name='uniq_fr_pair'),
+        ]
+        indexes = [
+            models.Index(fields=['sender', 'id']),
+            models.Index(fields=['receiver', 'id']),
+            models.Index(fields=['-created_time', 'id']),
+        ]
 
     def reject(self):
         self.delete()
         return
 
+    @atomic()
     def accept(self):
-        friendship = Friendship.create_friendship(self.sender, self.receiver)
-        self.delete()
+        friendship = Friendship.create_friendship(self.sender_id, self.receiver_id)
+        self.__class__.objects.filter(pk=self.pk).delete()
         return friendship
 
     @classmethod
@@ -35,7 +48,13 @@ class FriendshipRequest(BaseModel):
         if sender_id == receiver_id:
             raise SelfFriendshipError(_("User can not send request to him/her self"))
 
-        return cls.objects.create(sender_id=sender_id, receiver_id=receiver_id)
+        friendship_request, = cls.objects.bulk_create(
+            [cls(sender_id=sender_id, receiver_id=receiver_id)],
+            update_conflicts=True, unique_fields=['sender', 'receiver'], update_fields=['is_active', 'updated_time'],
+        )
+        # an existing request keeps its original created time.
+        friendship_request.refresh_from_db(fields=['created_time'])
+        return friendship_request
 
     def __str__(self):
         return f'{self.sender} requested {self.receiver}'
@@ -46,8 +65,8 @@ class Friendship(BaseModel):
     user_2 = models.ForeignKey(to=User, on_delete=models.CASCADE, related_name='r_friends')
 
     def save(self, *args, **kwargs):
-        if self.user_1.id < self.user_2.id:
-            self.user_1, self.user_2 = self.user_2, self.user_1
+        if self.user_1_id < self.user_2_id:
+            self.user_1_id, self.user_2_id = self.user_2_id, self.user_1_id
         super(Friendship, self).save(*args, **kwargs)
 
     class Meta:
@@ -55,35 +74,68 @@ class Friendship(BaseModel):
         verbose_name_plural = _('Friendships')
         unique_together = (('user_1', 'user_2'),)
         ordering = ("-created_time", )
+        indexes = [
+            models.Index(fields=['-created_time', 'id']),
+            models.Index(fields=['user_1', '-created_time']),
+            models.Index(fields=['user_2', '-created_time']),
+        ]
 
     def __str__(self):
         return f'{self.user_1} - {self.user_2}'
 
     @classmethod
-    def _check_friendship_with_id(cls, user_1_id: int, user_2_id: int) -> bool:
-        if user_1_id > user_2_id:
-            return cls.objects.filter(user_1_id=user_1_id, user_2_id=user_2_id).exists()
-        return cls.objects.filter(user_2_id=user_1_id, user_1_id=user_2_id).exists()
+    def _load_friend_ids(cls, user_id: int) -> set:
+        left = cls.objects.filter(user_1_id=user_id).order_by().values_list('user_2_id', flat=True)
+        right = cls.objects.filter(user_2_id=user_id).order_by().values_list('user_1_id', flat=True)
+        return set(left.union(right))
 
     @classmethod
-    def _check_friendship_with_user_instance(cls, user_1: User, user_2: User) -> bool:
-        if user_1.id > user_2.id:
-            return cls.objects.filter(user_1=user_1, user_2=user_2).exists()
-        return cls.objects.filter(user_2=user_1, user_1=user_2).exists()
+    def get_friend_ids(cls, user_id: int) -> set:
+        friend_cache = FriendCache(settings.REDIS_CLIENT)
+        friend_ids = friend_cache.get_friends(user_id)
+        if friend_ids is None:
+            friend_ids = cls._load_friend_ids(user_id)
+            friend_cache.fill(user_id, friend_ids)
+        return friend_ids
 
     @classmethod
     def check_friendship(cls, user_1: Union[User, int], user_2: Union[User, int]) -> bool:
         if isinstance(user_1, User) and isinstance(user_2, User):
-            return cls._check_friendship_with_user_instance(user_1, user_2)
-        elif isinstance(user_1, int) and isinstance(user_2, int):
-            return cls._check_friendship_with_id(user_1, user_2)
+            user_1, user_2 = user_1.id, user_2.id
+        elif not (isinstance(user_1, int) and isinstance(user_2, int)):
+            raise ValueError(f"Arguments must both be either integer or User instance.")
+
+        is_friend = FriendCache(settings.REDIS_CLIENT).is_friend(user_1, user_2)
+        if is_friend is None:
+            return user_2 in cls.get_friend_ids(user_1)
+        return is_friend
 
-        raise ValueError(f"Arguments must both be either integer or User instance.")
+    @staticmethod
+    def get_friend_list_version_key(user_id: int) -> str:
+        return f'social:friends:{user_id}:version'
+
+    @classmethod
+    def get_friend_list_cache_key(cls, user_id: int, cursor, with_count: bool = False) -> str:
+        version = settings.REDIS_CLIENT.get(cls.get_friend_list_version_key(user_id)) or 0
+        return f'social:friends:{user_id}:{version}:cursor:{cursor}:count:{int(with_count)}'
 
     @classmethod
-    def create_friendship(cls, user_1, user_2):
-        return cls.objects.create(user_1=user_1, user_2=user_2)
+    def bump_friend_list_version(cls, *user_ids: int):
+        pipeline = get_pipeline(settings.REDIS_CLIENT)
+        for user_id in user_ids:
+            pipeline.incr(cls.get_friend_list_version_key(user_id))
+        pipeline.execute()
+
+    @classmethod
+    def create_friendship(cls, user_1: Union[User, int], user_2: Union[User, int]) -> 'Friendship':
+        user_1_id = user_1.id if isinstance(user_1, User) else user_1
+        user_2_id = user_2.id if isinstance(user_2, User) else user_2
+        user_1_id, user_2_id = sorted([user_1_id, user_2_id], reverse=True)
+        friendship, __ = cls.objects.get_or_create(user_1_id=user_1_id, user_2_id=user_2_id)
+        return friendship
 
     @classmethod
     def list_friends(cls, user):
-        return cls.objects.filter(user_1=user) | cls.objects.filter(user_2=user)
+        left = cls.objects.filter(user_1=user).order_by().values('id')
+        right = cls.objects.filter(user_2=user).order_by().values('id')
+        return cls.objects.filter(pk__in=left.union(right, all=True))
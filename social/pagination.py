@@ -0,0 +1,19 @@
+from rest_framework.pagination import CursorPagination
+
+
+class FriendshipCursorPagination(CursorPagination):
+    ordering = ('-created_time', '-id', )
+    count_query_param = 'include_count'
+
+    def include_count(self, request) -> bool:
+        return bool(request.query_params.get(self.count_query_param))
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.count = queryset.count() if self.include_count(request) else None
+        return super(FriendshipCursorPagination, self).paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        response = super(FriendshipCursorPagination, self).get_paginated_response(data)
+        if self.count is not None:
+            response.data['count'] = self.count
+        return response
@@ -1,22 +1,30 @@
+from django.db.models import prefetch_related_objects
 from rest_framework import serializers
 
+from player_shop.models import PlayerWallet
 from social.models import FriendshipRequest, Friendship
-from user.serializers import PlayerProfileSerializer
+from user.serializers import PlayerProfileField, PlayerProfileSerializer
+
+
+class PlayerPrefetchListSerializer(serializers.ListSerializer):
+    def to_representation(self, data):
+        instances = list(data.all() if hasattr(data, 'all') else data)
+        prefetch_related_objects(instances, *self.child.prefetch_lookups)
+        return super(PlayerPrefetchListSerializer, self).to_representation(instances)
 
 
 class FriendshipRequestSerializer(serializers.ModelSerializer):
     id = serializers.IntegerField(read_only=True)
-    sender = serializers.SerializerMethodField()
+    sender = PlayerProfileField()
     receiver_id = serializers.IntegerField(write_only=True, required=True)
     created_time = serializers.DateTimeField(read_only=True)
 
+    prefetch_lookups = (PlayerWallet.prefetch_current_assets('sender__shop_info'), )
+
     class Meta:
         model = FriendshipRequest
         fields = ['id', 'sender', 'receiver_id', 'created_time']
-
-    @staticmethod
-    def get_sender(obj):
-        return PlayerProfileSerializer(obj.sender.player).data
+        list_serializer_class = PlayerPrefetchListSerializer
 
     def create(self, validated_data):
         return FriendshipRequest.create(
@@ -27,29 +35,43 @@ class FriendshipRequestSerializer(serializers.ModelSerializer):
 
 class RequestedFriendshipSerializer(serializers.ModelSerializer):
     id = serializers.IntegerField(read_only=True)
-    receiver = serializers.SerializerMethodField()
+    receiver = PlayerProfileField()
+
+    prefetch_lookups = (PlayerWallet.prefetch_current_assets('receiver__shop_info'), )
 
     class Meta:
         model = FriendshipRequest
         fields = ['id', 'receiver', 'created_time', ]
-
-    @staticmethod
-    def get_receiver(obj):
-        return PlayerProfileSerializer(obj.receiver.player).data
+        list_serializer_class = PlayerPrefetchListSerializer
 
 
 class FriendshipSerializer(serializers.ModelSerializer):
-    user_1 = serializers.SerializerMethodField()
-    user_2 = serializers.SerializerMethodField()
+    user_1 = PlayerProfileField()
+    user_2 = PlayerProfileField()
+
+    prefetch_lookups = (
+        PlayerWallet.prefetch_current_assets('user_1__shop_info'),
+        PlayerWallet.prefetch_current_assets('user_2__shop_info'),
+    )
 
     class Meta:
         model = Friendship
         fields = ['id', 'user_1', 'user_2', 'created_time', ]
+        list_serializer_class = PlayerPrefetchListSerializer
 
-    @staticmethod
-    def get_user_1(obj):
-        return PlayerProfileSerializer(obj.user_1.player).data
+    @classmethod
+    def values_fields(cls) -> list:
+        return ['id', 'created_time', *PlayerProfileField.get_only_fields('user_1'),
+                *PlayerProfileField.get_only_fields('user_2')]
 
     @staticmethod
-    def get_user_2(obj):
-        return PlayerProfileSerializer(obj.user_2.player).data
+    def from_values(rows) -> list:
+        player_ids = {row[f'{relation}__id'] for row in rows for relation in ('user_1', 'user_2')}
+        avatars = PlayerWallet.current_avatars(player_ids)
+        created_time = serializers.DateTimeField()
+        return [{
+            'id': row['id'],
+            'user_1': PlayerProfileSerializer.values_dict(row, 'user_1', avatars),
+            'user_2': PlayerProfileSerializer.values_dict(row, 'user_2', avatars),
+            'created_time': created_time.to_representation(row['created_time']),
+        } for row in rows]
@@ -0,0 +1,53 @@
+from django.conf import settings
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from player_shop.models import AssetOwnership, PlayerWallet
+from shop.choices import AssetType
+from social.friend_cache import FriendCache
+from social.models import Friendship
+from user.models import User, NormalPlayer, GuestPlayer
+from user.serializers import PlayerProfileField
+
+FRIEND_PROFILE_FIELDS = frozenset(PlayerProfileField.model_fields)
+
+
+def _bump_friend_lists_showing(user_id: int):
+    Friendship.bump_friend_list_version(user_id, *Friendship.get_friend_ids(user_id))
+
+
+@receiver(signal=post_save, sender=Friendship)
+@receiver(signal=post_delete, sender=Friendship)
+def friendship_changed(sender, instance, **kwargs):
+    friend_cache = FriendCache(settings.REDIS_CLIENT)
+    user_ids = (instance.user_1_id, instance.user_2_id)
+    friend_cache.invalidate(*user_ids)
+
+    # a concurrent read can refill the caches from the pre-commit rows, so expire them again once committed.
+    def expire_committed():
+        friend_cache.invalidate(*user_ids)
+        Friendship.bump_friend_list_version(*user_ids)
+
+    transaction.on_commit(expire_committed)
+
+
+@receiver(signal=post_save, sender=User)
+@receiver(signal=post_save, sender=NormalPlayer)
+@receiver(signal=post_save, sender=GuestPlayer)
+def player_profile_changed(sender, instance, created, update_fields=None, **kwargs):
+    if created or (update_fields is not None and FRIEND_PROFILE_FIELDS.isdisjoint(update_fields)) \
+            or not instance.profile_changed():
+        return
+    user_id = instance.pk
+    transaction.on_commit(lambda: _bump_friend_lists_showing(user_id))
+
+
+@receiver(signal=post_save, sender=AssetOwnership)
+@receiver(signal=post_delete, sender=AssetOwnership)
+def player_avatar_changed(sender, instance, **kwargs):
+    if not instance.is_current or instance.asset.type != AssetType.AVATAR:
+        return
+    player_id = PlayerWallet.objects.filter(pk=instance.wallet_id).values_list('player_id', flat=True).first()
+    if player_id:
+        transaction.on_commit(lambda: _bump_friend_lists_showing(player_id))
@@ -1,80 +1,101 @@
-from django.test import TestCase
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from django.core.cache import cache
-from rest_framework.test import APITestCase
-from rest_framework import status
+from rest_framework.test import APITestCase, APIClient
+from rest_framework import serializers, status
 
-from user.models import NormalPlayer, GuestPlayer
+from user.models import NormalPlayer, GuestPlayer, User
+from social.friend_cache import FriendCache
 from social.models import FriendshipRequest, Friendship
-from shop.models import RewardPackage, ShopConfiguration
+from player_shop.models import AssetOwnership
+from shop.choices import AssetType
+from shop.models import RewardPackage, ShopConfiguration, Asset
+from social.serializers import FriendshipSerializer
 
 
+@override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
 class FriendshipRequestViewSetTests(APITestCase):
     """Test FriendshipRequestViewSet behaviors for friendship request management"""
 
-    def setUp(self):
+    @classmethod
+    def setUpTestData(cls):
         """Create test users and friendship data"""
         # Create initial package and shop config for player creation
-        self.initial_package = RewardPackage.objects.create(
+        cls.initial_package = RewardPackage.objects.create(
             name='Initial Package',
             reward_type=RewardPackage.RewardType.INIT_WALLET
         )
-        self.shop_config = ShopConfiguration.objects.create(
-            player_initial_package=self.initial_package
+        cls.shop_config = ShopConfiguration.objects.create(
+            player_initial_package=cls.initial_package
         )
 
         # Create test users
-        self.user = NormalPlayer.objects.create_user(
+        cls.user = NormalPlayer.objects.create_user(
             email='user@example.com',
             password='password123',
-            profile_name='TestUser'
+            profile_name='TestUser',
+            is_verified=True
         )
-        self.user.is_verified = True
-        self.user.save()
 
-        self.friend = NormalPlayer.objects.create_user(
+        cls.friend = NormalPlayer.objects.create_user(
             email='friend@example.com',
             password='password123',
-            profile_name='FriendUser'
+            profile_name='FriendUser',
+            is_verified=True
         )
-        self.friend.is_verified = True
-        self.friend.save()
 
-        self.other_user = NormalPlayer.objects.create_user(
+        cls.other_user = NormalPlayer.objects.create_user(
             email='other@example.com',
             password='password123',
-            profile_name='OtherUser'
+            profile_name='OtherUser',
+            is_verified=True
         )
-        self.other_user.is_verified = True
-        self.other_user.save()
 
-        self.guest_user = GuestPlayer.objects.create_user(
+        cls.guest_user = GuestPlayer.objects.create_user(
             device_id='guest-device-123',
             password='password123'
         )
 
         # Create some friendship requests for testing
-        self.incoming_request = FriendshipRequest.objects.create(
-            sender=self.friend,
-            receiver=self.user
+        cls.incoming_request = FriendshipRequest.objects.create(
+            sender=cls.friend,
+            receiver=cls.user
         )
 
-        self.outgoing_request = FriendshipRequest.objects.create(
-            sender=self.user,
-            receiver=self.other_user
+        cls.outgoing_request = FriendshipRequest.objects.create(
+            sender=cls.user,
+            receiver=cls.other_user
         )
 
         # Create friendship request from other user to friend (not involving main user)
-        self.unrelated_request = FriendshipRequest.objects.create(
-            sender=self.other_user,
-            receiver=self.friend
+        cls.unrelated_request = FriendshipRequest.objects.create(
+            sender=cls.other_user,
+            receiver=cls.friend
         )
 
+        cls.list_url = reverse('social-friendship-request-list')
+        cls.requested_url = reverse('social-friendship-request-requested')
+
+    @classmethod
+    def tearDownClass(cls):
+        """Drop cache entries that point at this class's rolled back fixtures"""
+        cache.clear()
+        super().tearDownClass()
+
+    def setUp(self):
+        """Start from empty caches and authenticate a client as the main test user"""
+        cache.clear()
+        FriendCache(settings.REDIS_CLIENT).invalidate(*User.objects.values_list('id', flat=True))
+        self.user_client = APIClient()
+        self.user_client.force_authenticate(user=self.user)
+
     def test_authenticated_user_can_view_received_friendship_requests(self):
         """Users should see friendship requests they have received"""
-        self.client.force_authenticate(user=self.user)
-
-        response = self.client.get(reverse('social-friendship-request-list'))
+        response = self.user_client.get(self.list_url)
 
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(len(response.data['results']), 1)
@@ -88,34 +109,31 @@ class FriendshipRequestViewSetTests(APITestCase):
         # Other user has no incoming requests
         self.client.force_authenticate(user=self.guest_user)
 
-        response = self.client.get(reverse('social-friendship-request-list'))
+        response = self.client.get(self.list_url)
 
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(len(response.data['results']), 0)
 
     def test_unauthenticated_user_cannot_view_friendship_requests(self):
         """Unauthenticated users cannot access friendship requests"""
-        response = self.client.get(reverse('social-friendship-request-list'))
+        response = self.client.get(self.list_url)
 
         self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
 
     def test_authenticated_user_can_send_friendship_request(self):
         """Users should be able to send friendship requests to other users"""
-        self.client.force_authenticate(user=self.user)
-
         # Create a new user to send request to
         new_user = NormalPlayer.objects.create_user(
             email='newuser@example.com',
             password='password123',
-            profile_name='NewUser'
+            profile_name='NewUser',
+            is_verified=True
         )
-        new_user.is_verified = True
-        new_user.save()
 
         data = {
             'receiver_id': new_user.id
         }
-        response = self.client.post(reverse('social-friendship-request-list'), data)
+        response = self.user_client.post(self.list_url, data)
         self.assertEqual(response.status_code, status.HTTP_201_CREATED)
         self.assertIn('id', response.data)
         self.assertIn('sender', response.data)
@@ -129,50 +147,136 @@ class FriendshipRequestViewSetTests(APITestCase):
             ).exists()
         )
 
+    def test_repeated_friendship_request_is_not_duplicated(self):
+        """Sending the same request twice should keep a single pending request"""
+        new_user = NormalPlayer.objects.create_user(
+            email='newuser@example.com',
+            password='password123',
+            profile_name='NewUser'
+        )
+
+        first = self.user_client.post(self.list_url, {'receiver_id': new_user.id})
+        second = self.user_client.post(self.list_url, {'receiver_id': new_user.id})
+
+        self.assertEqual(first.data['id'], second.data['id'])
+        self.assertEqual(FriendshipRequest.objects.filter(sender=self.user, receiver=new_user).count(), 1)
+
+    def test_friendship_check_is_served_from_friend_cache(self):
+        """Repeated friendship checks should not query the database"""
+        Friendship.objects.create(user_1=self.user, user_2=self.friend)
+        self.assertTrue(Friendship.check_friendship(self.user.id, self.friend.id))
+
+        with self.assertNumQueries(0):
+            self.assertTrue(Friendship.check_friendship(self.user.id, self.friend.id))
+
+    def test_friend_cache_is_invalidated_when_friendship_is_removed(self):
+        """Removing a friendship should be reflected by the next friendship check"""
+        friendship = Friendship.objects.create(user_1=self.user, user_2=self.friend)
+        self.assertTrue(Friendship.check_friendship(self.user, self.friend))
+
+        friendship.delete()
+
+        self.assertFalse(Friendship.check_friendship(self.user, self.friend))
+        self.assertFalse(Friendship.check_friendship(self.friend, self.user))
+
+    def test_resent_friendship_request_is_reactivated(self):
+        """Re-sending a deactivated request should make it visible again with its original created time"""
+        FriendshipRequest.objects.filter(pk=self.outgoing_request.pk).update(is_active=False)
+
+        response = self.user_client.post(self.list_url, {'receiver_id': self.other_user.id})
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['id'], self.outgoing_request.id)
+        self.assertEqual(response.data['created_time'],
+                         serializers.DateTimeField().to_representation(self.outgoing_request.created_time))
+        self.assertTrue(FriendshipRequest.objects.get(pk=self.outgoing_request.pk).is_active)
+
+    def test_friend_cache_filled_before_commit_is_dropped_on_commit(self):
+        """A friend set refilled from pre-commit rows should not outlive the removal commit"""
+        friendship = Friendship.objects.create(user_1=self.user, user_2=self.friend)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            friendship.delete()
+            FriendCache(settings.REDIS_CLIENT).fill(self.user.id, [self.friend.id])
+
+        self.assertFalse(Friendship.check_friendship(self.user, self.friend))
+
     def test_user_cannot_send_friendship_request_to_existing_friend(self):
         """Users should not be able to send requests to users they're already friends with"""
         # Create existing friendship
         Friendship.objects.create(user_1=self.user, user_2=self.friend)
 
-        self.client.force_authenticate(user=self.user)
-
         data = {
             'receiver_id': self.friend.id
         }
 
-        response = self.client.post(reverse('social-friendship-request-list'), data)
+        response = self.user_client.post(self.list_url, data)
         self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
         self.assertIn('error', response.data)
 
     def test_user_cannot_send_friendship_request_to_nonexistent_user(self):
         """Sending friendship request to non-existent user should fail"""
-        self.client.force_authenticate(user=self.user)
-
         data = {
             'receiver_id': 99999
         }
 
-        response = self.client.post(reverse('social-friendship-request-list'), data)
+        response = self.user_client.post(self.list_url, data)
 
         self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
 
     def test_user_cannot_send_friendship_request_to_themselves(self):
         """Users should not be able to send friendship requests to themselves"""
-        self.client.force_authenticate(user=self.user)
-
         data = {
             'receiver_id': self.user.id
         }
 
-        response = self.client.post(reverse('social-friendship-request-list'), data)
+        response = self.user_client.post(self.list_url, data)
 
         self.assertEqual(response.status_code, status.HTTP_406_NOT_ACCEPTABLE)
 
+    def test_received_friendship_requests_query_count_does_not_grow(self):
+        """Listing received requests should join senders and prefetch their avatars"""
+        with CaptureQueriesContext(connection) as initial_queries:
+            self.user_client.get(self.list_url)
+
+        for i in range(3):
+            sender = NormalPlayer.objects.create_user(email=f'sender{i}@example.com', password='password123')
+            FriendshipRequest.objects.create(sender=sender, receiver=self.user)
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.user_client.get(self.list_url)
+
+        self.assertEqual(len(response.data['results']), 4)
+        self.assertEqual(len(queries), len(initial_queries))
+
+    def test_sent_friendship_requests_load_only_profile_columns(self):
+        """Listing sent requests should not select unrelated user columns"""
+        with CaptureQueriesContext(connection) as queries:
+            self.user_client.get(self.requested_url)
+
+        request_query = next(query['sql'] for query in queries if 'social_friendshiprequest' in query['sql']
+                             and 'COUNT' not in query['sql'])
+        self.assertIn('profile_name', request_query)
+        self.assertNotIn('password', request_query)
+
+    def test_sent_friendship_requests_do_not_reload_receivers(self):
+        """Listing sent requests should not issue extra queries per receiver"""
+        with CaptureQueriesContext(connection) as initial_queries:
+            self.user_client.get(self.requested_url)
+
+        for i in range(3):
+            receiver = NormalPlayer.objects.create_user(email=f'receiver{i}@example.com', password='password123')
+            FriendshipRequest.objects.create(sender=self.user, receiver=receiver)
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.user_client.get(self.requested_url)
+
+        self.assertEqual(len(response.data['results']), 4)
+        self.assertEqual(len(queries), len(initial_queries))
+
     def test_user_can_view_sent_friendship_requests(self):
         """Users should be able to view friendship requests they have sent"""
-        self.client.force_authenticate(user=self.user)
-
-        response = self.client.get(reverse('social-friendship-request-requested'))
+        response = self.user_client.get(self.requested_url)
 
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(len(response.data['results']), 1)
@@ -183,9 +287,7 @@ class FriendshipRequestViewSetTests(APITestCase):
 
     def test_user_can_cancel_sent_friendship_request(self):
         """Users should be able to cancel friendship requests they have sent"""
-        self.client.force_authenticate(user=self.user)
-
-        response = self.client.delete(
+        response = self.user_client.delete(
             reverse('social-friendship-request-requested-delete', kwargs={'request_id': self.outgoing_request.id})
         )
 
@@ -198,9 +300,7 @@ class FriendshipRequestViewSetTests(APITestCase):
 
     def test_user_cannot_cancel_other_users_sent_request(self):
         """Users should not be able to cancel requests sent by others"""
-        self.client.force_authenticate(user=self.user)
-
-        response = self.client.delete(
+        response = self.user_client.delete(
             reverse('social-friendship-request-requested-delete', kwargs={'request_id': self.unrelated_request.id})
         )
 
@@ -208,9 +308,7 @@ class FriendshipRequestViewSetTests(APITestCase):
 
     def test_user_can_accept_incoming_friendship_request(self):
         """Users should be able to accept friendship requests sent to them"""
-        self.client.force_authenticate(user=self.user)
-
-        response = self.client.post(
+        response = self.user_client.post(
             reverse('social-friendship-request-accept', kwargs={'pk': self.incoming_request.id})
         )
 
@@ -231,11 +329,20 @@ class FriendshipRequestViewSetTests(APITestCase):
             FriendshipRequest.objects.filter(id=self.incoming_request.id).exists()
         )
 
+    def test_accepting_request_for_existing_friendship_reuses_it(self):
+        """Accepting a request between existing friends should not create a duplicate friendship"""
+        existing = Friendship.objects.create(user_1=self.user, user_2=self.friend)
+        response = self.user_client.post(
+            reverse('social-friendship-request-accept', kwargs={'pk': self.incoming_request.id})
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['id'], existing.id)
+        self.assertEqual(Friendship.objects.count(), 1)
+
     def test_user_can_reject_incoming_friendship_request(self):
         """Users should be able to reject friendship requests sent to them"""
-        self.client.force_authenticate(user=self.user)
-
-        response = self.client.post(
+        response = self.user_client.post(
             reverse('social-friendship-request-reject', kwargs={'pk': self.incoming_request.id})
         )
 
@@ -254,19 +361,24 @@ class FriendshipRequestViewSetTests(APITestCase):
 
     def test_user_cannot_accept_request_not_sent_to_them(self):
         """Users should not be able to accept requests not sent to them"""
-        self.client.force_authenticate(user=self.user)
-
-        response = self.client.post(
+        response = self.user_client.post(
             reverse('social-friendship-request-accept', kwargs={'pk': self.unrelated_request.id})
         )
 
         self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
 
+    def test_sender_cannot_accept_their_own_request(self):
+        """Only the receiver of a friendship request should be able to accept it"""
+        response = self.user_client.post(
+            reverse('social-friendship-request-accept', kwargs={'pk': self.outgoing_request.id})
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertFalse(Friendship.check_friendship(self.user, self.other_user))
+
     def test_user_cannot_reject_request_not_sent_to_them(self):
         """Users should not be able to reject requests not sent to them"""
-        self.client.force_authenticate(user=self.user)
-
-        response = self.client.post(
+        response = self.user_client.post(
             reverse('social-friendship-request-reject', kwargs={'pk': self.unrelated_request.id})
         )
 
@@ -274,9 +386,7 @@ class FriendshipRequestViewSetTests(APITestCase):
 
     def test_user_can_delete_received_friendship_request(self):
         """Users should be able to delete friendship requests sent to them"""
-        self.client.force_authenticate(user=self.user)
-
-        response = self.client.delete(
+        response = self.user_client.delete(
             reverse('social-friendship-request-detail', kwargs={'pk': self.incoming_request.id})
         )
 
@@ -290,27 +400,22 @@ class FriendshipRequestViewSetTests(APITestCase):
     def test_friendship_requests_are_paginated(self):
         """Friendship requests should support pagination"""
         # Create many friendship requests
-        for i in range(25):
-            sender = NormalPlayer.objects.create_user(
-                email=f'sender{i}@example.com',
-                password='password123',
-                profile_name=f'Sender{i}'
-            )
-            sender.is_verified = True
-            sender.save()
-
-            FriendshipRequest.objects.create(
-                sender=sender,
-                receiver=self.user
-            )
-
-        self.client.force_authenticate(user=self.user)
-        response = self.client.get(reverse('social-friendship-request-list'))
+        password = make_password('password123')
+        senders = User.objects.bulk_create([
+            User(username=f'sender{i}@example.com', email=f'sender{i}@example.com', password=password,
+                 profile_name=f'Sender{i}')
+            for i in range(25)
+        ])
+        FriendshipRequest.objects.bulk_create([
+            FriendshipRequest(sender=sender, receiver=self.user) for sender in senders
+        ])
+
+        response = self.user_client.get(self.list_url, {'include_count': 1})
 
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertIn('count', response.data)
-        self.assertIn('next', response.data)
-        self.assertEqual(response.data['count'], 26)  # 1 original + 25 new
+        self.assertIsNotNone(response.data['next'])
+        self.assertEqual(response.data['count'], 26)
+        self.assertEqual(len(response.data['results']), 20)  # 26 requests, first page of 20
 
     def test_guest_user_can_send_and_receive_friendship_requests(self):
         """Guest users should also be able to use the friendship system"""
@@ -321,15 +426,13 @@ class FriendshipRequestViewSetTests(APITestCase):
             'receiver_id': self.user.id
         }
 
-        response = self.client.post(reverse('social-friendship-request-list'), data)
+        response = self.client.post(self.list_url, data)
 
         self.assertEqual(response.status_code, status.HTTP_201_CREATED)
 
     def test_friendship_request_includes_complete_sender_profile(self):
         """Friendship request response should include complete sender profile"""
-        self.client.force_authenticate(user=self.user)
-
-        response = self.client.get(reverse('social-friendship-request-list'))
+        response = self.user_client.get(self.list_url)
 
         self.assertEqual(response.status_code, status.HTTP_200_OK)
 
@@ -341,85 +444,92 @@ class FriendshipRequestViewSetTests(APITestCase):
         self.assertIn('gender', sender_data)
         self.assertIn('current_avatar', sender_data)
 
-    def tearDown(self):
-        """Clear cache after each test"""
-        cache.clear()
-
 
+@override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
 class FriendshipViewSetTests(APITestCase):
     """Test FriendshipViewSet behaviors for friendship management"""
 
-    def setUp(self):
+    @classmethod
+    def setUpTestData(cls):
         """Create test users and friendships"""
         # Create initial package and shop config for player creation
-        self.initial_package = RewardPackage.objects.create(
+        cls.initial_package = RewardPackage.objects.create(
             name='Initial Package',
             reward_type=RewardPackage.RewardType.INIT_WALLET
         )
-        self.shop_config = ShopConfiguration.objects.create(
-            player_initial_package=self.initial_package
+        cls.shop_config = ShopConfiguration.objects.create(
+            player_initial_package=cls.initial_package
         )
 
         # Create test users
-        self.user = NormalPlayer.objects.create_user(
+        cls.user = NormalPlayer.objects.create_user(
             email='user@example.com',
             password='password123',
-            profile_name='TestUser'
+            profile_name='TestUser',
+            is_verified=True
         )
-        self.user.is_verified = True
-        self.user.save()
 
-        self.friend1 = NormalPlayer.objects.create_user(
+        cls.friend1 = NormalPlayer.objects.create_user(
             email='friend1@example.com',
             password='password123',
-            profile_name='Friend1'
+            profile_name='Friend1',
+            is_verified=True
         )
-        self.friend1.is_verified = True
-        self.friend1.save()
 
-        self.friend2 = NormalPlayer.objects.create_user(
+        cls.friend2 = NormalPlayer.objects.create_user(
             email='friend2@example.com',
             password='password123',
-            profile_name='Friend2'
+            profile_name='Friend2',
+            is_verified=True
         )
-        self.friend2.is_verified = True
-        self.friend2.save()
 
-        self.other_user = NormalPlayer.objects.create_user(
+        cls.other_user = NormalPlayer.objects.create_user(
             email='other@example.com',
             password='password123',
-            profile_name='OtherUser'
+            profile_name='OtherUser',
+            is_verified=True
         )
-        self.other_user.is_verified = True
-        self.other_user.save()
 
-        self.guest_user = GuestPlayer.objects.create_user(
+        cls.guest_user = GuestPlayer.objects.create_user(
             device_id='guest-device-123',
             password='password123'
         )
 
         # Create friendships
-        self.friendship1 = Friendship.objects.create(
-            user_1=self.user,
-            user_2=self.friend1
+        cls.friendship1 = Friendship.objects.create(
+            user_1=cls.user,
+            user_2=cls.friend1
         )
 
-        self.friendship2 = Friendship.objects.create(
-            user_1=self.friend2,
-            user_2=self.user
+        cls.friendship2 = Friendship.objects.create(
+            user_1=cls.friend2,
+            user_2=cls.user
         )
 
         # Create friendship not involving main user
-        self.unrelated_friendship = Friendship.objects.create(
-            user_1=self.friend1,
-            user_2=self.other_user
+        cls.unrelated_friendship = Friendship.objects.create(
+            user_1=cls.friend1,
+            user_2=cls.other_user
         )
 
+        cls.list_url = reverse('social-friendship-list')
+
+    @classmethod
+    def tearDownClass(cls):
+        """Drop cache entries that point at this class's rolled back fixtures"""
+        cache.clear()
+        super().tearDownClass()
+
+    def setUp(self):
+        """Start from empty caches and authenticate a client as the main test user"""
+        cache.clear()
+        FriendCache(settings.REDIS_CLIENT).invalidate(*User.objects.values_list('id', flat=True))
+        self.user_client = APIClient()
+        self.user_client.force_authenticate(user=self.user)
+
     def test_authenticated_user_can_view_their_friendships(self):
         """Users should see all their friendships"""
-        self.client.force_authenticate(user=self.user)
-
-        response = self.client.get(reverse('social-friendship-list'))
+        response = self.user_client.get(self.list_url)
 
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(len(response.data['results']), 2)
@@ -429,26 +539,111 @@ class FriendshipViewSetTests(APITestCase):
         self.assertIn(self.friendship1.id, friendship_ids)
         self.assertIn(self.friendship2.id, friendship_ids)
 
+    def test_friendship_list_query_count_does_not_grow_with_friends(self):
+        """Listing friendships should join both users instead of loading them per row"""
+        with CaptureQueriesContext(connection) as initial_queries:
+            self.user_client.get(self.list_url)
+
+        friends = [NormalPlayer.objects.create_user(email=f'new_friend{i}@example.com', password='password123')
+                   for i in range(3)]
+        with self.captureOnCommitCallbacks(execute=True):
+            for friend in friends:
+                Friendship.objects.create(user_1=self.user, user_2=friend)
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.user_client.get(self.list_url)
+
+        self.assertEqual(len(response.data['results']), 5)
+        self.assertEqual(len(queries), len(initial_queries))
+
+    def test_friendship_list_is_served_from_cache(self):
+        """Repeated friendship list requests should not hit the database"""
+        self.user_client.get(self.list_url)
+
+        with self.assertNumQueries(0):
+            response = self.user_client.get(self.list_url)
+
+        self.assertEqual(len(response.data['results']), 2)
+
+    def test_friendship_list_cache_is_invalidated_on_change(self):
+        """New and removed friendships should show up in the next list response"""
+        self.user_client.get(self.list_url)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.friendship1.delete()
+            Friendship.create_friendship(self.user, self.other_user)
+        response = self.user_client.get(self.list_url)
+
+        friendship_ids = [f['id'] for f in response.data['results']]
+        self.assertEqual(len(friendship_ids), 2)
+        self.assertNotIn(self.friendship1.id, friendship_ids)
+
+    def test_friendship_list_cache_is_invalidated_on_friend_profile_change(self):
+        """A friend's new profile name should show up in the next list response"""
+        self.user_client.get(self.list_url)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.friend1.profile_name = 'RenamedFriend'
+            self.friend1.save(update_fields=['profile_name'])
+        response = self.user_client.get(self.list_url)
+
+        friend = next(f[side] for f in response.data['results'] for side in ('user_1', 'user_2')
+                      if f[side]['id'] == self.friend1.id)
+        self.assertEqual(friend['profile_name'], 'RenamedFriend')
+
+    def test_friend_list_version_is_bumped_after_commit(self):
+        """Friend lists should keep their cache key until a friend's profile change commits"""
+        cache_key = Friendship.get_friend_list_cache_key(self.user.id, None)
+
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.friend1.profile_name = 'RenamedFriend'
+            self.friend1.save(update_fields=['profile_name'])
+            self.assertEqual(Friendship.get_friend_list_cache_key(self.user.id, None), cache_key)
+        for callback in callbacks:
+            callback()
+
+        self.assertNotEqual(Friendship.get_friend_list_cache_key(self.user.id, None), cache_key)
+
+    def test_saving_friend_without_profile_change_keeps_friend_lists(self):
+        """Unrelated player saves such as unblocking should not expire friend lists"""
+        player = NormalPlayer.objects.get(pk=self.friend1.pk)
+
+        with self.captureOnCommitCallbacks() as callbacks:
+            player.unblock()
+
+        self.assertEqual(callbacks, [])
+
+    def test_friendship_list_cache_is_invalidated_on_friend_avatar_change(self):
+        """A friend's new avatar should show up in the next list response"""
+        self.user_client.get(self.list_url)
+
+        avatar = Asset.objects.create(name='Friend Avatar', type=AssetType.AVATAR)
+        with self.captureOnCommitCallbacks(execute=True):
+            AssetOwnership.objects.create(wallet=self.friend1.shop_info, asset=avatar, is_current=True)
+        response = self.user_client.get(self.list_url)
+
+        friend = next(f[side] for f in response.data['results'] for side in ('user_1', 'user_2')
+                      if f[side]['id'] == self.friend1.id)
+        self.assertEqual(friend['current_avatar']['id'], avatar.id)
+
     def test_user_sees_empty_list_when_no_friends(self):
         """Users with no friends should see empty list"""
         self.client.force_authenticate(user=self.other_user)
 
-        response = self.client.get(reverse('social-friendship-list'))
+        response = self.client.get(self.list_url)
 
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(len(response.data['results']), 1)  # Only the unrelated friendship they're part of
 
     def test_unauthenticated_user_cannot_view_friendships(self):
         """Unauthenticated users cannot access friendships"""
-        response = self.client.get(reverse('social-friendship-list'))
+        response = self.client.get(self.list_url)
 
         self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
 
     def test_friendship_response_includes_both_users_profiles(self):
         """Friendship response should include complete profile information for both users"""
-        self.client.force_authenticate(user=self.user)
-
-        response = self.client.get(reverse('social-friendship-list'))
+        response = self.user_client.get(self.list_url)
 
         self.assertEqual(response.status_code, status.HTTP_200_OK)
 
@@ -466,11 +661,19 @@ class FriendshipViewSetTests(APITestCase):
             self.assertIn('gender', user_data)
             self.assertIn('current_avatar', user_data)
 
+    def test_friendship_list_matches_serializer_output(self):
+        """Friendship list rows built from values() should match FriendshipSerializer output"""
+        avatar = Asset.objects.create(name='Friend Avatar', config={'color': 'blue'}, type=AssetType.AVATAR)
+        AssetOwnership.objects.create(wallet=self.friend1.shop_info, asset=avatar, is_current=True)
+
+        response = self.user_client.get(self.list_url)
+
+        friendships = Friendship.list_friends(self.user).order_by('-created_time', '-id')
+        self.assertEqual(response.data['results'], FriendshipSerializer(friendships, many=True).data)
+
     def test_user_can_unfriend_another_user(self):
         """Users should be able to remove friendships"""
-        self.client.force_authenticate(user=self.user)
-
-        response = self.client.delete(
+        response = self.user_client.delete(
             reverse('social-friendship-detail', kwargs={'pk': self.friendship1.id})
         )
 
@@ -483,9 +686,7 @@ class FriendshipViewSetTests(APITestCase):
 
     def test_user_cannot_delete_friendship_they_are_not_part_of(self):
         """Users should not be able to delete friendships they're not part of"""
-        self.client.force_authenticate(user=self.user)
-
-        response = self.client.delete(
+        response = self.user_client.delete(
             reverse('social-friendship-detail', kwargs={'pk': self.unrelated_friendship.id})
         )
 
@@ -493,9 +694,7 @@ class FriendshipViewSetTests(APITestCase):
 
     def test_deleting_nonexistent_friendship_returns_404(self):
         """Deleting non-existent friendship should return 404"""
-        self.client.force_authenticate(user=self.user)
-
-        response = self.client.delete(
+        response = self.user_client.delete(
             reverse('social-friendship-detail', kwargs={'pk': 99999})
         )
 
@@ -503,9 +702,7 @@ class FriendshipViewSetTests(APITestCase):
 
     def test_friendship_ordering_consistency(self):
         """Friendships should maintain consistent user ordering regardless of creation order"""
-        self.client.force_authenticate(user=self.user)
-
-        response = self.client.get(reverse('social-friendship-list'))
+        response = self.user_client.get(self.list_url)
 
         self.assertEqual(response.status_code, status.HTTP_200_OK)
 
@@ -526,7 +723,7 @@ class FriendshipViewSetTests(APITestCase):
 
         self.client.force_authenticate(user=self.guest_user)
 
-        response = self.client.get(reverse('social-friendship-list'))
+        response = self.client.get(self.list_url)
 
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(len(response.data['results']), 1)
@@ -535,33 +732,38 @@ class FriendshipViewSetTests(APITestCase):
     def test_friendships_are_paginated(self):
         """Friendships list should support pagination"""
         # Create many friendships
-        for i in range(25):
-            friend = NormalPlayer.objects.create_user(
-                email=f'friend{i + 10}@example.com',
-                password='password123',
-                profile_name=f'Friend{i + 10}'
-            )
-            friend.is_verified = True
-            friend.save()
-
-            Friendship.objects.create(
-                user_1=self.user,
-                user_2=friend
-            )
+        password = make_password('password123')
+        friends = User.objects.bulk_create([
+            User(username=f'friend{i + 10}@example.com', email=f'friend{i + 10}@example.com', password=password,
+                 profile_name=f'Friend{i + 10}')
+            for i in range(25)
+        ])
+        # bulk_create skips Friendship.save(), so keep the larger id in user_1 here
+        Friendship.objects.bulk_create([
+            Friendship(user_1=friend, user_2=self.user) for friend in friends
+        ])
+
+        response = self.user_client.get(self.list_url, {'include_count': 1})
 
-        self.client.force_authenticate(user=self.user)
-        response = self.client.get(reverse('social-friendship-list'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIsNotNone(response.data['next'])
+        self.assertEqual(response.data['count'], 27)
+        self.assertEqual(len(response.data['results']), 20)  # 27 friendships, first page of 20
+
+        next_page = self.user_client.get(response.data['next'])
+        self.assertEqual(len(next_page.data['results']), 7)
+        self.assertIsNone(next_page.data['next'])
+
+    def test_friendship_list_skips_count_unless_requested(self):
+        """Friendships list should only include a total count when include_count is passed"""
+        response = self.user_client.get(self.list_url)
 
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertIn('count', response.data)
-        self.assertIn('next', response.data)
-        self.assertEqual(response.data['count'], 27)  # 2 original + 25 new
+        self.assertNotIn('count', response.data)
 
     def test_friendship_includes_creation_time(self):
         """Friendship response should include creation time for sorting/display"""
-        self.client.force_authenticate(user=self.user)
-
-        response = self.client.get(reverse('social-friendship-list'))
+        response = self.user_client.get(self.list_url)
 
         self.assertEqual(response.status_code, status.HTTP_200_OK)
 
@@ -573,14 +775,13 @@ class FriendshipViewSetTests(APITestCase):
         new_user = NormalPlayer.objects.create_user(
             email='newuser@example.com',
             password='password123',
-            profile_name='NewUser'
+            profile_name='NewUser',
+            is_verified=True
         )
-        new_user.is_verified = True
-        new_user.save()
 
         self.client.force_authenticate(user=new_user)
 
-        response = self.client.get(reverse('social-friendship-list'))
+        response = self.client.get(self.list_url)
 
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(len(response.data['results']), 0)
@@ -589,11 +790,11 @@ class FriendshipViewSetTests(APITestCase):
         """Both users in a friendship should see the same friendship"""
         # Check from user's perspective
         self.client.force_authenticate(user=self.user)
-        user_response = self.client.get(reverse('social-friendship-list'))
+        user_response = self.client.get(self.list_url)
 
         # Check from friend's perspective
         self.client.force_authenticate(user=self.friend1)
-        friend_response = self.client.get(reverse('social-friendship-list'))
+        friend_response = self.client.get(self.list_url)
 
         self.assertEqual(user_response.status_code, status.HTTP_200_OK)
         self.assertEqual(friend_response.status_code, status.HTTP_200_OK)
@@ -604,7 +805,3 @@ class FriendshipViewSetTests(APITestCase):
 
         self.assertIn(self.friendship1.id, user_friendship_ids)
         self.assertIn(self.friendship1.id, friend_friendship_ids)
-
-    def tearDown(self):
-        """Clear cache after each test"""
-        cache.clear()
@@ -1,8 +1,8 @@
-from rest_framework.routers import DefaultRouter
+from rest_framework.routers import SimpleRouter
 
 from social.views import FriendshipRequestViewSet, FriendshipViewSet
 
-router = DefaultRouter()
+router = SimpleRouter()
 
 router.register("social/friendship_request", FriendshipRequestViewSet, basename="social-friendship-request")
 router.register("social/friendship", FriendshipViewSet, basename="social-friendship")
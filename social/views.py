@@ -1,16 +1,17 @@
+from django.core.cache import cache
 from django.http import Http404
-from django.shortcuts import get_object_or_404
 from django.utils.translation import gettext_lazy as _
 from rest_framework import mixins, status
 from rest_framework.decorators import action
-from rest_framework.pagination import PageNumberPagination
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.viewsets import GenericViewSet
 
 from exceptions.social import AlreadyFriendError, SelfFriendshipError, ReceiverInvalidError
 from social.models import FriendshipRequest, Friendship
+from social.pagination import FriendshipCursorPagination
 from social.serializers import FriendshipRequestSerializer, RequestedFriendshipSerializer, FriendshipSerializer
+from user.serializers import PlayerProfileField
 
 
 class FriendshipRequestViewSet(GenericViewSet, mixins.ListModelMixin, mixins.DestroyModelMixin,
@@ -18,10 +19,13 @@ class FriendshipRequestViewSet(GenericViewSet, mixins.ListModelMixin, mixins.Des
     queryset = FriendshipRequest.objects.filter(is_active=True)
     serializer_class = FriendshipRequestSerializer
     permission_classes = [IsAuthenticated]
-    pagination_class = PageNumberPagination
+    pagination_class = FriendshipCursorPagination
 
     def list(self, request, *args, **kwargs):
-        queryset = self.filter_queryset(self.queryset.filter(receiver=self.request.user))
+        queryset = self.filter_queryset(
+            self.queryset.filter(receiver=self.request.user).select_related('sender')
+            .only('id', 'created_time', 'sender', *PlayerProfileField.get_only_fields('sender'))
+        )
 
         page = self.paginate_queryset(queryset)
         if page is not None:
@@ -32,28 +36,19 @@ class FriendshipRequestViewSet(GenericViewSet, mixins.ListModelMixin, mixins.Des
         return Response(serializer.data)
 
     def get_requested_friendships(self):
-        return self.queryset.filter(sender=self.request.user)
+        return self.queryset.filter(sender=self.request.user).select_related('receiver') \
+            .only('id', 'created_time', 'sender', 'receiver', *PlayerProfileField.get_only_fields('receiver'))
 
     def get_object(self):
         obj: FriendshipRequest = super(FriendshipRequestViewSet, self).get_object()
-        if obj.receiver.id == self.request.user.id or obj.sender.id == self.request.user.id:
+        if obj.receiver_id == self.request.user.id or obj.sender_id == self.request.user.id:
             return obj
         raise Http404
 
     def get_requested_friendship_object(self) -> FriendshipRequest:
-        queryset = self.get_requested_friendships()
-        lookup_url_kwarg = 'request_id'
-        assert lookup_url_kwarg in self.kwargs, (
-                'Expected view %s to be called with a URL keyword argument '
-                'named "%s". Fix your URL conf, or set the `.lookup_field` '
-                'attribute on the view correctly.' %
-                (self.__class__.__name__, lookup_url_kwarg)
-        )
-        filter_kwargs = {self.lookup_field: self.kwargs[lookup_url_kwarg]}
-        obj = get_object_or_404(queryset, **filter_kwargs)
-
-        self.check_object_permissions(self.request, obj)
-
+        obj = self.queryset.filter(sender=self.request.user, pk=self.kwargs['request_id']).first()
+        if obj is None:
+            raise Http404
         return obj
 
     def get_serializer_context(self):
@@ -98,7 +93,9 @@ class FriendshipRequestViewSet(GenericViewSet, mixins.ListModelMixin, mixins.Des
     @action(methods=['POST'], detail=True, url_path='accept', url_name='accept',
             serializer_class=FriendshipSerializer)
     def accept(self, request, *args, **kwargs):
-        friendship_request = self.get_object()
+        friendship_request = self.queryset.filter(pk=self.kwargs['pk'], receiver=self.request.user).first()
+        if friendship_request is None:
+            raise Http404
         friendship = friendship_request.accept()
         return Response(data=self.get_serializer(friendship).data, status=status.HTTP_201_CREATED)
 
@@ -110,10 +107,28 @@ class FriendshipRequestViewSet(GenericViewSet, mixins.ListModelMixin, mixins.Des
 
 
 class FriendshipViewSet(GenericViewSet, mixins.ListModelMixin, mixins.DestroyModelMixin):
-    queryset = Friendship.objects.all()
+    queryset = Friendship.objects.none()
     serializer_class = FriendshipSerializer
     permission_classes = [IsAuthenticated, ]
-    pagination_class = PageNumberPagination
+    pagination_class = FriendshipCursorPagination
+    view_cache_timeout = 60 * 5
 
     def get_queryset(self):
-        return Friendship.list_friends(self.request.user)
+        return Friendship.list_friends(self.request.user).select_related('user_1', 'user_2')
+
+    def list(self, request, *args, **kwargs):
+        cursor = self.request.query_params.get(self.paginator.cursor_query_param)
+        cache_key = Friendship.get_friend_list_cache_key(self.request.user.id, cursor,
+                                                         self.paginator.include_count(self.request))
+        data = cache.get(cache_key)
+        if data is not None:
+            return Response(data, status=status.HTTP_200_OK)
+        queryset = self.filter_queryset(Friendship.list_friends(self.request.user)) \
+            .values(*FriendshipSerializer.values_fields())
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            response = self.get_paginated_response(FriendshipSerializer.from_values(page))
+        else:
+            response = Response(FriendshipSerializer.from_values(list(queryset)))
+        cache.set(cache_key, response.data, self.view_cache_timeout)
+        return response
@@ -1,12 +1,15 @@
 import os
 from celery import Celery, bootsteps
+from celery.utils.log import get_logger
 from kombu import Exchange, Queue, Consumer
-from match.tasks import handle_game_started
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "suji.settings")
 app = Celery("suji")
 app.config_from_object("django.conf:settings", namespace="CELERY")
-app.autodiscover_tasks()
+app.autodiscover_tasks(packages=['common', 'user', 'shop', 'player_shop', 'social', 'player_statistic', 'leaderboard',
+                                 'match'], related_name='tasks')
+
+logger = get_logger(__name__)
 
 GAME_EXCHANGE = Exchange("game.events", type="topic", durable=True)
 GAME_QUEUE = Queue(
@@ -21,16 +24,8 @@ GAME_QUEUE = Queue(
 )
 
 task_queues = (
-    Queue(
-        "game.events.start",
-        exchange=GAME_EXCHANGE,
-        routing_key="game_started.*",
-        durable=True,
-        queue_arguments={
-            "x-dead-letter-exchange": "game.events.dlx",
-            "x-dead-letter-routing-key": "game-started.failed",
-        },
-    ),
+    Queue(app.conf.task_default_queue),
+    GAME_QUEUE,
     Queue(
         "game.events.dlq",
         exchange=Exchange("game.events.dlx", type="topic", durable=True),
@@ -47,22 +42,47 @@ app.conf.task_routes = {
     }
 }
 
-app.conf.worker_prefetch_multiplier = 1  # process one message at a time per worker
-app.conf.broker_heartbeat = 10
+app.conf.worker_prefetch_multiplier = int(os.environ.get("CELERY_WORKER_PREFETCH_MULTIPLIER", "4"))
+# game events are acked by GameEventsConsumer only after the handler finishes, so a crashed worker's prefetched
+# batch is redelivered and failed events are rejected into game.events.dlx. Default queue tasks keep Celery's
+# early acks; the email tasks must not be resent after a worker dies mid-send.
+app.conf.broker_heartbeat = int(os.environ.get("CELERY_BROKER_HEARTBEAT", "30"))
+app.conf.broker_heartbeat_checkrate = int(os.environ.get("CELERY_BROKER_HEARTBEAT_CHECKRATE", "2"))
 
 
 class GameEventsConsumer(bootsteps.ConsumerStep):
+    """Consume game.events.start for both raw JSON events and Celery task messages.
+
+    The game server still publishes plain JSON events without Celery headers, which the task consumer
+    would reject into the dead letter queue, so this step owns the queue and runs the handler in-process.
+    """
+
+    def __init__(self, parent, **kwargs):
+        parent.app.amqp.queues.deselect(GAME_QUEUE.name)
+        super(GameEventsConsumer, self).__init__(parent, **kwargs)
+
     def get_consumers(self, channel):
         return [Consumer(
             channel,
             queues=[GAME_QUEUE],
-            accept=["json"],
+            accept=["json", "msgpack"],
             callbacks=[self.on_message],
         )]
 
     def on_message(self, body, message):
-        # body is your event JSON dict
-        handle_game_started.delay(body)
-        message.ack()
+        from match.tasks import handle_game_started
+
+        if message.headers.get("task") == handle_game_started.name:
+            args, kwargs, _embed = body
+        else:
+            args, kwargs = (body,), {}
+        try:
+            handle_game_started(*args, **kwargs)
+        except Exception:
+            logger.exception("game event on %s failed, dead-lettering it", GAME_QUEUE.name)
+            message.reject(requeue=False)
+        else:
+            message.ack()
+
 
 app.steps["consumer"].add(GameEventsConsumer)
@@ -1,57 +1,47 @@
+from functools import lru_cache
 from os import environ as env
 
-from redis import Redis
+from redis import Redis, ConnectionPool
+from redis.client import Pipeline
 
+_POOLS: dict[tuple, ConnectionPool] = {}
 
-def get_redis_client(is_test: bool = False) -> Redis:
+
+def _get_connection_pool(is_test: bool, db_key: str) -> ConnectionPool:
     test = 'TEST_' if is_test else ''
 
     # REDIS CONFIG
     r_host = f'{test}REDIS_HOST'
     r_port = f'{test}REDIS_PORT'
     r_password = f'{test}REDIS_PASSWORD'
-    r_db = f'{test}REDIS_DB'
-
-    db = env.get(r_db, '0')
+    r_db = f'{test}{db_key}'
 
     host = env.get(r_host)
-    port = env.get(r_port, '6379')
-    db = db
+    port = int(env.get(r_port, '6379'))
+    db = int(env.get(r_db, '0'))
     password = env.get(r_password, '1')
     password_required = env.get("REDIS_PASSWORD_REQUIRED", "True") == "True"
-    connection_kwargs = {
-        "host": host,
-        "port": port,
-        "db": db,
-        "decode_responses": True
-    }
-    if password_required:
-        connection_kwargs["password"] = password
-    return Redis(**connection_kwargs)
+    if not password_required:
+        password = None
 
+    pool_key = (host, port, db, password)
+    pool = _POOLS.get(pool_key)
+    if pool is None:
+        pool = ConnectionPool(host=host, port=port, db=db, password=password, decode_responses=True,
+                              max_connections=int(env.get("REDIS_MAX_CONNECTIONS", "50")))
+        _POOLS[pool_key] = pool
+    return pool
 
-def get_matchmaker_redis_client(is_test: bool = False) -> Redis:
-    test = 'TEST_' if is_test else ''
 
-    # REDIS CONFIG
-    r_host = f'{test}REDIS_HOST'
-    r_port = f'{test}REDIS_PORT'
-    r_password = f'{test}REDIS_PASSWORD'
-    r_db = f'{test}MATCHMAKER_REDIS_DB'
+@lru_cache(maxsize=2)
+def get_redis_client(is_test: bool = False) -> Redis:
+    return Redis(connection_pool=_get_connection_pool(is_test, 'REDIS_DB'))
 
-    db = env.get(r_db, '0')
 
-    host = env.get(r_host)
-    port = env.get(r_port, '6379')
-    db = db
-    password = env.get(r_password, '1')
-    password_required = env.get("REDIS_PASSWORD_REQUIRED", "True") == "True"
-    connection_kwargs = {
-        "host": host,
-        "port": port,
-        "db": db,
-        "decode_responses": True
-    }
-    if password_required:
-        connection_kwargs["password"] = password
-    return Redis(**connection_kwargs)
+@lru_cache(maxsize=2)
+def get_matchmaker_redis_client(is_test: bool = False) -> Redis:
+    return Redis(connection_pool=_get_connection_pool(is_test, 'MATCHMAKER_REDIS_DB'))
+
+
+def get_pipeline(client: Redis, transaction: bool = False) -> Pipeline:
+    return client.pipeline(transaction=transaction)
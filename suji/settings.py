@@ -1,14 +1,16 @@
+import base64
 import os
 from datetime import timedelta
 from pathlib import Path
 
-from cryptography.fernet import Fernet
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
 from redis import Redis
 
 from suji.redis import get_redis_client
 from mongoengine import connect as mongo_connect
 
-MONGO_CLIENT = mongo_connect(host=os.environ.get("MONGO_DB_URI"))
+# connect=False defers opening sockets until the first Mongo operation.
+MONGO_CLIENT = mongo_connect(host=os.environ.get("MONGO_DB_URI"), connect=False)
 
 
 # EMAIL CONFIG
@@ -63,7 +65,7 @@ ALLOWED_HOSTS = os.environ.get('ALLOWED_HOSTS', '').split(',')
 
 PROJECT_NAME = os.environ.get('PROJECT_NAME', "suji")
 
-INSTALLED_APPS = [
+INSTALLED_APPS = (
     'user.apps.UserConfig',
     'django.contrib.admin',
     'django.contrib.auth',
@@ -83,12 +85,12 @@ INSTALLED_APPS = [
     'social.apps.SocialConfig',
     'player_statistic.apps.PlayerStatisticConfig',
     'leaderboard.apps.LeaderboardConfig',
-    'match.apps.MatchConfig'
-]
+    'match.apps.MatchConfig',
+)
 
 AUTH_USER_MODEL = 'user.User'
 
-MIDDLEWARE = [
+MIDDLEWARE = (
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     "corsheaders.middleware.CorsMiddleware",
@@ -97,7 +99,7 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
-]
+)
 CORS_ALLOW_ALL_ORIGINS = True
 
 ROOT_URLCONF = 'suji.urls'
@@ -122,13 +124,21 @@ WSGI_APPLICATION = 'suji.wsgi.application'
 
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.postgresql_psycopg2',
+        'ENGINE': 'django.db.backends.postgresql',
         'NAME': os.getenv('POSTGRES_DB', default=PROJECT_NAME),
         'USER': os.getenv('POSTGRES_USER', default='postgres'),
         'PASSWORD': os.getenv('POSTGRES_PASSWORD', default='12345'),
         'HOST': os.getenv('POSTGRES_HOST', default='localhost'),
         'PORT': int(os.getenv('POSTGRES_PORT', default='5432')),
-        'CONN_MAX_AGE': int(os.getenv('CONN_MAX_AGE', default=60)),
+        'CONN_MAX_AGE': int(os.getenv('CONN_MAX_AGE', default=600)),
+        'CONN_HEALTH_CHECKS': os.getenv('CONN_HEALTH_CHECKS', default='True') == 'True',
+        'DISABLE_SERVER_SIDE_CURSORS': os.getenv('DISABLE_SERVER_SIDE_CURSORS', default='False') == 'True',
+        'OPTIONS': {
+            'sslmode': os.getenv('PG_SSLMODE', default='prefer'),
+        },
+        'TEST': {
+            'MIGRATE': os.getenv('TEST_MIGRATE', default='False') == 'True',
+        },
     }
 }
 
@@ -138,6 +148,11 @@ CACHES = {
         "LOCATION": os.environ.get('REDIS_URI', ""),
         "TIMEOUT": int(os.getenv('REDIS_TIMEOUT', default='3600')),
         "KEY_PREFIX": os.getenv('REDIS_KEY_PREFIX', default=PROJECT_NAME),
+        "OPTIONS": {
+            "pool_class": "redis.BlockingConnectionPool",
+            "max_connections": int(os.getenv('REDIS_MAX_CONNECTIONS', default='50')),
+            "timeout": int(os.getenv('REDIS_POOL_TIMEOUT', default='20')),
+        },
     }
 }
 
@@ -145,7 +160,7 @@ CACHE_EXPT = {
     "otp": int(os.environ.get("OTP_EXPIRATION_TIME", "120"))
 }
 
-AUTH_PASSWORD_VALIDATORS = [
+AUTH_PASSWORD_VALIDATORS = (
     {
         'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',
     },
@@ -158,7 +173,13 @@ AUTH_PASSWORD_VALIDATORS = [
     {
         'NAME': 'django.contrib.auth.password_validation.NumericPasswordValidator',
     },
-]
+)
+
+PASSWORD_HASHERS = (
+    'django.contrib.auth.hashers.Argon2PasswordHasher',
+    'django.contrib.auth.hashers.PBKDF2PasswordHasher',
+    'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+)
 
 REDIS_CLIENT = get_redis_client()
 
@@ -170,8 +191,7 @@ USE_L10N = True
 
 
 LOGS_DIR = os.path.join(BASE_DIR, 'logs')
-if not os.path.exists(LOGS_DIR):
-    os.makedirs(LOGS_DIR)
+os.makedirs(LOGS_DIR, exist_ok=True)
 
 
 LOGGING = {
@@ -215,20 +235,20 @@ LOGGING = {
 }
 
 
-LANGUAGES = [
+LANGUAGES = (
     ('en', 'English'),
     ('fa', 'Farsi'),
-]
+)
 
-LOCALE_PATHS = [
+LOCALE_PATHS = (
     os.path.join(BASE_DIR, 'locale'),
-]
+)
 
-NEEDED_DIRS = [
-    os.path.join(BASE_DIR, 'static'),
-    os.path.join(BASE_DIR, 'temp'),
-    os.path.join(BASE_DIR, 'media')
-]
+NEEDED_DIRS = (
+    str(BASE_DIR / 'static'),
+    str(BASE_DIR / 'temp'),
+    str(BASE_DIR / 'media'),
+)
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
@@ -237,6 +257,10 @@ REST_FRAMEWORK = {
     'DEFAULT_PAGINATION_CLASS': "rest_framework.pagination.PageNumberPagination",
     'PAGE_SIZE': int(os.getenv('DEFAULT_PAGE_SIZE', default=20)),
     'DEFAULT_FILTER_BACKENDS': ['django_filters.rest_framework.DjangoFilterBackend'],
+    'DEFAULT_RENDERER_CLASSES': (
+        'drf_orjson_renderer.renderers.ORJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ),
 }
 
 SIMPLE_JWT = {
@@ -245,11 +269,8 @@ SIMPLE_JWT = {
     "AUTH_HEADER_TYPES": ("Bearer",),
 }
 
-CIPHER_SUITE = Fernet(os.environ.get("ENCRYPTION_KEY"))
-
-for d in NEEDED_DIRS:
-    if not os.path.isdir(d):
-        os.mkdir(d)
+# ENCRYPTION_KEY is a urlsafe base64 encoded 32 byte key (AES-256-GCM); Fernet.generate_key() output fits.
+AES_GCM = AESGCM(base64.urlsafe_b64decode(os.environ.get("ENCRYPTION_KEY")))
 
 STATIC_URL = f'/static/'
 STATIC_ROOT = os.path.join(BASE_DIR, 'static')
@@ -275,8 +296,9 @@ CELERYD_MAX_TASKS_PER_CHILD = 100
 CELERY_ACKS_LATE = True
 CELERY_TASK_TIME_LIMIT = 30
 
-CELERY_TASK_SERIALIZER = "json"
-CELERY_ACCEPT_CONTENT = ["json"]
+CELERY_TASK_SERIALIZER = "msgpack"
+# json stays accepted because task results are still serialized as json.
+CELERY_ACCEPT_CONTENT = ["msgpack", "json"]
 CELERY_RESULT_SERIALIZER = "json"
 CELERY_TIMEZONE = TIME_ZONE
 
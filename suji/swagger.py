@@ -1,3 +1,5 @@
+import os
+
 from django.urls import path
 from rest_framework import permissions
 from drf_yasg.views import get_schema_view
@@ -40,8 +42,14 @@ schema_view = get_schema_view(
 )
 
 
+SCHEMA_CACHE_TIMEOUT = int(os.environ.get("SWAGGER_CACHE_TIMEOUT", "3600"))
+SCHEMA_CACHE_KWARGS = {"key_prefix": "swagger"}
+
 swagger_urlpatterns = [
-    path('swagger<format>/', schema_view.without_ui(cache_timeout=0), name='schema-json'),
-    path('swagger/', schema_view.with_ui('swagger', cache_timeout=0), name='schema-swagger-ui'),
-    path('redoc/', schema_view.with_ui('redoc', cache_timeout=0), name='schema-redoc'),
+    path('swagger<format>/', schema_view.without_ui(cache_timeout=SCHEMA_CACHE_TIMEOUT,
+                                                    cache_kwargs=SCHEMA_CACHE_KWARGS), name='schema-json'),
+    path('swagger/', schema_view.with_ui('swagger', cache_timeout=SCHEMA_CACHE_TIMEOUT,
+                                         cache_kwargs=SCHEMA_CACHE_KWARGS), name='schema-swagger-ui'),
+    path('redoc/', schema_view.with_ui('redoc', cache_timeout=SCHEMA_CACHE_TIMEOUT,
+                                       cache_kwargs=SCHEMA_CACHE_KWARGS), name='schema-redoc'),
 ]
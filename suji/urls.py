@@ -1,10 +1,12 @@
+from itertools import chain
+
 from django.conf import settings
 from django.conf.urls.static import static
 from django.contrib import admin
 from django.shortcuts import redirect
 from django.urls import path, include
 from django.utils.translation import gettext_lazy as _
-from rest_framework.routers import DefaultRouter
+from rest_framework.routers import SimpleRouter
 from common.urls import router as common_router
 from user.urls import router as user_router
 from shop.urls import router as shop_router
@@ -16,22 +18,24 @@ from match.urls import router as match_router
 from suji.swagger import swagger_urlpatterns
 
 
-router = DefaultRouter()
+router = SimpleRouter()
 
-router.registry.extend(common_router.registry)
-router.registry.extend(user_router.registry)
-router.registry.extend(shop_router.registry)
-router.registry.extend(player_shop_router.registry)
-router.registry.extend(social_router.registry)
-router.registry.extend(player_stats_router.registry)
-router.registry.extend(leaderboard_router.registry)
-router.registry.extend(match_router.registry)
+router.registry = list(chain(
+    common_router.registry,
+    user_router.registry,
+    shop_router.registry,
+    player_shop_router.registry,
+    social_router.registry,
+    player_stats_router.registry,
+    leaderboard_router.registry,
+    match_router.registry,
+))
 
 
 admin.site.site_header = _('{project_name} Management Panel').format(project_name=settings.PROJECT_NAME)
 
 urlpatterns = [
-    path('', lambda request: redirect(to='admin/', permenant=True)),
+    path('', lambda request: redirect(to='admin/', permanent=True)),
     path('admin/', admin.site.urls),
     path('api/', include(router.urls)),
 ] + swagger_urlpatterns + static(settings.STATIC_URL, document_root=settings.STATIC_ROOT)
@@ -28,8 +28,9 @@ class UserBaseAdmin(_UserAdmin):
         (_("Important dates"), {"fields": ("last_login", "date_joined")}),
     ]
     readonly_fields = ["last_login", "date_joined"]
-    list_filter = ['is_superuser', 'is_staff']
-    search_fields = ['username', 'email', ]
+    list_filter = ('is_superuser', 'is_staff', )
+    search_fields = ('username', 'email', )
+    show_full_result_count = False
 
 
 @admin.register(User)
@@ -39,7 +40,7 @@ class UserAdmin(UserBaseAdmin):
 
 class PlayerAdmin(admin.ModelAdmin):
     list_display = ["email", 'device_id', "first_name", "last_name", "is_staff", ]
-    list_filter = UserBaseAdmin.list_filter + ['gender']
+    list_filter = (*UserBaseAdmin.list_filter, 'gender', )
     fieldsets = [
         (None, {"fields": ("email", "device_id",)}),
         (_('Block info'), {
@@ -56,16 +57,17 @@ class PlayerAdmin(admin.ModelAdmin):
     ]
 
     search_fields = UserBaseAdmin.search_fields
+    show_full_result_count = False
 
 
 @admin.register(GuestPlayer)
 class GuestUserAdmin(PlayerAdmin):
     list_display = ['device_id', "first_name", "last_name", ]
-    search_fields = PlayerAdmin.search_fields + ['device_id']
+    search_fields = (*PlayerAdmin.search_fields, 'device_id', )
 
 
 @admin.register(NormalPlayer)
 class NormalPlayerAdmin(PlayerAdmin):
     list_display = ["email", "first_name", "last_name", "is_staff", 'is_verified']
-    search_fields = PlayerAdmin.search_fields + ['email']
-    list_filter = PlayerAdmin.list_filter + ['is_verified']
+    search_fields = PlayerAdmin.search_fields
+    list_filter = (*PlayerAdmin.list_filter, 'is_verified', )
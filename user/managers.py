@@ -1,6 +1,7 @@
-from django.conf import settings
 from django.contrib.auth.base_user import BaseUserManager
 
+from utils.cryptography import encrypt_string
+
 
 class UserManager(BaseUserManager):
 
@@ -24,18 +25,27 @@ class UserManager(BaseUserManager):
         user.save(using=self._db)
         return user
 
+    def get_queryset(self):
+        return super(UserManager, self).get_queryset().select_related('shop_info')
+
     def create_superuser(self, email, password=None, **extra_fields):
         extra_fields.setdefault('is_staff', True)
         extra_fields.setdefault('is_superuser', True)
         return self.create_user(username=email, email=email, password=password, **extra_fields)
 
 
+class UserWithPlayerManager(UserManager):
+    def get_queryset(self):
+        return super(UserWithPlayerManager, self).get_queryset().select_related('normalplayer', 'guestplayer')
+
+
 class NormalPlayerManager(UserManager):
     def create_user(self, email=None, device_id=None, password=None, **extra_fields):
         extra_fields.setdefault('is_verified', False)
         user = self.create_user_base(email, device_id, password, **extra_fields)
         user.save(using=self._db)
-        user.send_email_verification()
+        if not user.is_verified:
+            user.send_email_verification()
         return user
 
 
@@ -43,11 +53,7 @@ class GuestPlayerManager(UserManager):
 
     @staticmethod
     def _create_recovery_string(device_id: str) -> str:
-        cipher_suite = settings.CIPHER_SUITE
-        plaintext_bytes = device_id.encode()
-        encrypted_bytes = cipher_suite.encrypt(plaintext_bytes)
-        encrypted_string = encrypted_bytes.decode()
-        return encrypted_string
+        return encrypt_string(device_id)
 
     def create_user(self, email=None, device_id=None, password=None, **extra_fields):
         user = self.create_user_base(email, device_id, password, **extra_fields)
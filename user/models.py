@@ -1,20 +1,21 @@
 import datetime
+import hmac
 import json
-import random
+import secrets
+from functools import partial
 from datetime import timedelta
 from typing import Union
 from uuid import uuid4
 
 from django.conf import settings
+from django.contrib.auth.hashers import make_password
 from django.contrib.auth.models import PermissionsMixin, AbstractUser
-from django.core.cache import cache
 from django.core.exceptions import ValidationError
-from django.db import models, connection
-from django.db.models import QuerySet
+from django.db import models, connection, connections, transaction
+from django.db.models import Q
 from django.db.transaction import atomic
-from django.template.loader import render_to_string
 from django.utils import translation, timezone
-from django.utils.html import strip_tags
+from django.utils.functional import cached_property
 from django.utils.translation import gettext_lazy as _
 from rest_framework_simplejwt.tokens import RefreshToken, AccessToken
 
@@ -22,9 +23,8 @@ from common.models import BaseModel
 from exceptions.user import ReVerifyException, EmailAlreadyTakenError
 from shop.choices import AssetType
 from user.choices import Gender
-from user.managers import UserManager, NormalPlayerManager, GuestPlayerManager
-from utils.cryptography import encrypt_string, decrypt_string
-from utils.random_functions import generate_random_string
+from user.managers import UserWithPlayerManager, NormalPlayerManager, GuestPlayerManager
+from user.tasks import send_email_verification_task, send_password_reset_task
 
 
 class PlayerDailyReward(models.Model):
@@ -50,12 +50,12 @@ class PlayerDailyReward(models.Model):
         elif self.last_claimed_delta == 1:
             self.daily_reward_streak = (self.daily_reward_streak % max_streak) + 1
         self.last_claimed = timezone.now()
-        self.save()
+        self.save(update_fields=['daily_reward_streak', 'last_claimed'])
         return self
 
     def reset_streak(self):
         self.daily_reward_streak = 0
-        self.save()
+        self.save(update_fields=['daily_reward_streak'])
 
     class Meta:
         abstract = True
@@ -73,9 +73,15 @@ class PlayerLuckyWheel(models.Model):
         next_lucky_wheel_spin = self._next_lucky_wheel(lucky_wheel_cool_down)
         return next_lucky_wheel_spin <= timedelta(0), next_lucky_wheel_spin
 
-    def spin_lucky_wheel(self):
-        self.last_lucky_wheel_spin = timezone.now()
-        self.save()
+    def spin_lucky_wheel(self, lucky_wheel_cool_down: timedelta) -> bool:
+        now = timezone.now()
+        updated = self.__class__._default_manager.filter(
+            Q(last_lucky_wheel_spin__isnull=True) | Q(last_lucky_wheel_spin__lte=now - lucky_wheel_cool_down),
+            pk=self.pk,
+        ).update(last_lucky_wheel_spin=now)
+        if updated:
+            self.last_lucky_wheel_spin = now
+        return bool(updated)
 
     class Meta:
         abstract = True
@@ -97,7 +103,11 @@ class User(AbstractUser, PermissionsMixin, PlayerDailyReward, PlayerLuckyWheel):
     block_reliefe_time = models.DateTimeField(verbose_name=_('Block reliefe'), null=True, blank=True)
     profile_name = models.CharField(max_length=255, null=True, blank=True, verbose_name=_("Profile name"))
 
-    objects = UserManager()
+    objects = UserWithPlayerManager()
+
+    CACHED_FIELDS = ('profile_name', 'username')
+    PROFILE_FIELDS = ('profile_name', 'gender', 'birth_date')
+    CACHE_KEY = "USERS"
 
     USERNAME_FIELD = "email"
     REQUIRED_FIELDS = []
@@ -119,6 +129,25 @@ class User(AbstractUser, PermissionsMixin, PlayerDailyReward, PlayerLuckyWheel):
             return None
         return self.block_reliefe_time
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super(User, cls).from_db(db, field_names, values)
+        instance._cached_dto_state = instance._get_cached_dto_state()
+        instance._profile_state = instance._get_profile_state()
+        return instance
+
+    def _get_profile_state(self):
+        return tuple(self.__dict__.get(field) for field in self.PROFILE_FIELDS)
+
+    def profile_changed(self) -> bool:
+        return getattr(self, '_profile_state', None) != self._get_profile_state()
+
+    def _get_cached_dto_state(self):
+        return tuple(self.__dict__.get(field) for field in self.CACHED_FIELDS)
+
+    def _caching_dto_dirty(self) -> bool:
+        return getattr(self, '_cached_dto_state', None) != self._get_cached_dto_state()
+
     def _get_caching_dto(self):
         return {
             "id": self.id,
@@ -127,9 +156,23 @@ class User(AbstractUser, PermissionsMixin, PlayerDailyReward, PlayerLuckyWheel):
             "username": self.username,
         }
 
+    @staticmethod
+    def write_user_cache(payloads: dict):
+        if payloads:
+            settings.REDIS_CLIENT.hset(User.CACHE_KEY, mapping=payloads)
+
+    @classmethod
+    def bulk_from_cache(cls, ids) -> list:
+        if not ids:
+            return []
+        return [json.loads(raw) if raw else None for raw in settings.REDIS_CLIENT.hmget(cls.CACHE_KEY, ids)]
+
     def cache_user(self):
-        redis_client = settings.REDIS_CLIENT
-        redis_client.hset(f"USERS", self.id, json.dumps(self._get_caching_dto()))
+        if not self._caching_dto_dirty():
+            return
+        self._cached_dto_state = self._get_cached_dto_state()
+        payload = json.dumps(self._get_caching_dto())
+        transaction.on_commit(partial(User.write_user_cache, {self.id: payload}))
 
     def __str__(self):
         return self.email or self.device_id or ""
@@ -137,16 +180,18 @@ class User(AbstractUser, PermissionsMixin, PlayerDailyReward, PlayerLuckyWheel):
     def get_full_name(self):
         return f"{self.first_name or ""} {self.last_name or ""}"
 
-    @property
+    @cached_property
     def player(self):
+        if isinstance(self, (NormalPlayer, GuestPlayer)):
+            return self
         if self.email:
-            return NormalPlayer.objects.get(pk=self.pk)
-        return GuestPlayer.objects.get(pk=self.pk)
+            return getattr(self, 'normalplayer', None) or getattr(self, 'guestplayer', None)
+        return getattr(self, 'guestplayer', None) or getattr(self, 'normalplayer', None)
 
     def invite_count(self):
         return self.invites.count()
 
-    @property
+    @cached_property
     def current_avatar(self):
         shop_info = getattr(self, "shop_info", None)
         if not shop_info:
@@ -154,6 +199,13 @@ class User(AbstractUser, PermissionsMixin, PlayerDailyReward, PlayerLuckyWheel):
         current = shop_info.current_asset(AssetType.AVATAR)
         return current.asset if current else None
 
+    def mark_cache_dirty(self):
+        self._cached_dto_state = None
+
+    def reset_current_avatar(self):
+        self.__dict__.pop('current_avatar', None)
+        self.mark_cache_dirty()
+
     @property
     def current_avatar_json(self):
         avatar = self.current_avatar
@@ -167,7 +219,10 @@ class User(AbstractUser, PermissionsMixin, PlayerDailyReward, PlayerLuckyWheel):
 
     def save(self, *args, **kwargs):
         super(User, self).save(*args, **kwargs)
-        self.cache_user()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None or not set(self.CACHED_FIELDS).isdisjoint(update_fields):
+            self.cache_user()
+        self._profile_state = self._get_profile_state()
 
     @classmethod
     def get_random_users(cls, count):
@@ -183,6 +238,9 @@ class User(AbstractUser, PermissionsMixin, PlayerDailyReward, PlayerLuckyWheel):
 
 
 class Player(User):
+    AUTH_FIELDS = ('id', 'password', 'username', 'email', 'device_id', 'uuid', 'profile_name', 'gender', 'birth_date',
+                   'first_name', 'last_name', 'shop_info')
+
     class Meta:
         abstract = True
 
@@ -210,8 +268,8 @@ class Player(User):
     @staticmethod
     def refresh_token(refresh):
         refresh = RefreshToken(token=refresh)
-        user = Player.objects.filter(id=refresh.access_token.payload['id']).first()
-        return user.get_token(refresh)
+        user = User.objects.get(pk=refresh['user_id'])
+        return user.player.get_token()
 
     @classmethod
     def attempt_login(cls, **kwargs):
@@ -223,6 +281,8 @@ class GuestPlayer(Player):
 
     objects = GuestPlayerManager()
 
+    AUTH_FIELDS = Player.AUTH_FIELDS + ('recovery_string', )
+
     class Meta:
         verbose_name = _("Guest player")
         verbose_name_plural = _("Guest players")
@@ -243,10 +303,11 @@ class GuestPlayer(Player):
 
     @classmethod
     def attempt_login(cls, device_id: str, password: str):
-        user: QuerySet = cls.objects.filter(device_id=device_id)
-        if not user.exists():
+        user: GuestPlayer = cls.objects.only(*cls.AUTH_FIELDS).filter(device_id=device_id).first()
+        if user is None:
+            # Hash anyway so unknown accounts take as long to reject as wrong passwords.
+            make_password(password)
             return None, None, 'Invalid credentials.'
-        user: GuestPlayer = user.first()
 
         is_correct = user.check_password(raw_password=password)
 
@@ -257,10 +318,9 @@ class GuestPlayer(Player):
 
     @classmethod
     def attempt_recovery(cls, device_id, recovery_string: str, new_password: str):
-        user: QuerySet = cls.objects.filter(device_id=device_id)
-        if not user.exists():
+        user: GuestPlayer = cls.objects.only(*cls.AUTH_FIELDS).filter(device_id=device_id).first()
+        if user is None:
             return None, None, 'Invalid credentials.'
-        user: GuestPlayer = user.first()
 
         is_correct = user._check_recovery_string(recovery_string=recovery_string)
 
@@ -272,30 +332,33 @@ class GuestPlayer(Player):
 
     def save(self, *args, **kwargs):
         if not self.pk:
-            self.profile_name = f'guest-{generate_random_string(length=10)}'
+            self.profile_name = f'guest-{secrets.token_urlsafe(8)}'
         super(GuestPlayer, self).save(*args, **kwargs)
 
     @atomic()
     def convert_to_normal_player(self, email: str, password: str, profile_name: str = None):
-        existing_email = NormalPlayer.objects.filter(email=email).first()
-        if existing_email:
+        if User.objects.filter(email=email).exists():
             raise EmailAlreadyTakenError(_("This email is already is use"))
-        user = self.user_ptr
-        normal_player = NormalPlayer(
-            user_ptr=user,
-            profile_name=profile_name or self.profile_name,
-            gender=self.gender,
-            birth_date=self.birth_date,
-            is_blocked=self.is_blocked,
+        User.objects.filter(pk=self.pk).update(
             email=email,
-            is_verified=False,
             username=email,
-            device_id=None
+            device_id=None,
+            profile_name=profile_name or self.profile_name,
+            password=make_password(password),
         )
-
-        self.delete(keep_parents=True)
-        normal_player.set_password(password)
-        normal_player.save()
+        db_connection = connections[self._state.db]
+        quote_name = db_connection.ops.quote_name
+        with db_connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {quote_name(GuestPlayer._meta.db_table)} '
+                           f'WHERE {quote_name(GuestPlayer._meta.pk.column)} = %s', [self.pk])
+            cursor.execute(f'INSERT INTO {quote_name(NormalPlayer._meta.db_table)} '
+                           f'({quote_name(NormalPlayer._meta.pk.column)}, '
+                           f'{quote_name(NormalPlayer._meta.get_field("is_verified").column)}) VALUES (%s, %s)',
+                           [self.pk, False])
+        normal_player = NormalPlayer.objects.get(pk=self.pk)
+        # The user row was updated in place, so the freshly loaded state is not what the cache holds.
+        normal_player.mark_cache_dirty()
+        normal_player.cache_user()
         normal_player.send_email_verification()
         return normal_player
 
@@ -305,6 +368,8 @@ class NormalPlayer(Player):
 
     objects = NormalPlayerManager()
 
+    AUTH_FIELDS = Player.AUTH_FIELDS + ('is_verified', )
+
     class Meta:
         verbose_name = _("Normal player")
         verbose_name_plural = _("Normal players")
@@ -318,36 +383,23 @@ class NormalPlayer(Player):
 
     def _construct_otp(self):
         otp_expt = settings.CACHE_EXPT['otp']
-        otp = ''.join([str(random.randint(0, 9)) for __ in range(6)])
-        cache.set(f"{self.id}_EMAIL_VERIFY_OTP", otp, otp_expt)
+        otp = f'{secrets.randbelow(1_000_000):06d}'
+        settings.REDIS_CLIENT.set(f"{self.id}_EMAIL_VERIFY_OTP", otp, ex=otp_expt)
         return otp
 
     def _get_otp(self):
-        return cache.get(f"{self.id}_EMAIL_VERIFY_OTP")
+        return settings.REDIS_CLIENT.get(f"{self.id}_EMAIL_VERIFY_OTP")
+
+    def _pop_otp(self):
+        return settings.REDIS_CLIENT.getdel(f"{self.id}_EMAIL_VERIFY_OTP")
 
     def send_email_verification(self):
         if self.is_verified:
             raise ReVerifyException(message=_("Player is already verified."), )
 
         otp = self._construct_otp()
-
-        subject = _(f"{settings.PROJECT_NAME} email verification.")
-
-        html_message = render_to_string('email_verification.html', {
-            'user': self,
-            'otp': otp,
-            'project_name': settings.PROJECT_NAME,
-            'LANGUAGE_CODE': translation.get_language()
-        })
-
-        plain_message = strip_tags(html_message)
-
-        self.email_user(
-            subject=subject,
-            message=plain_message,
-            from_email=settings.DEFAULT_FROM_EMAIL,
-            html_message=html_message,
-        )
+        transaction.on_commit(partial(send_email_verification_task.delay, self.email, self.username, otp,
+                                      translation.get_language()), robust=True)
 
     def resend_email_verification(self) -> bool:
         last_otp = self._get_otp
@@ -357,61 +409,43 @@ class NormalPlayer(Player):
         return True
 
     def _forget_password_attempt(self) -> tuple:
-        previous_password_forget = cache.get(f"{self.id}_FORGET_PASSWORD_TOKEN")
-        if previous_password_forget:
-            return False, ''
         otp_expt = settings.CACHE_EXPT['otp']
-        forget_password_token = f'{self.email}{timezone.now().timestamp()}'
-        forget_password_token_encrypt = encrypt_string(forget_password_token)
-        cache.set(f"{self.id}_FORGET_PASSWORD_TOKEN", forget_password_token, otp_expt)
-        return True, forget_password_token_encrypt
+        forget_password_token = secrets.token_urlsafe(32)
+        created = settings.REDIS_CLIENT.set(f"{self.id}_FORGET_PASSWORD_TOKEN", forget_password_token,
+                                            ex=otp_expt, nx=True)
+        if not created:
+            return False, ''
+        return True, forget_password_token
 
     def forget_password(self, deep_link: str = ''):
         success, token = self._forget_password_attempt()
         if not success:
             return False
         reset_link = deep_link.format(token=token)
-        html_message = render_to_string('password_reset.html', {
-            'user': self,
-            'reset_link': reset_link,
-            'project_name': settings.PROJECT_NAME,
-            'LANGUAGE_CODE': translation.get_language(),
-        })
-
-        plain_message = strip_tags(html_message)
-
-        self.email_user(
-            subject=_("Password Reset Request"),
-            message=plain_message,
-            from_email=settings.DEFAULT_FROM_EMAIL,
-            html_message=html_message,
-        )
+        transaction.on_commit(partial(send_password_reset_task.delay, self.email, self.username, reset_link,
+                                      translation.get_language()), robust=True)
         return True
 
     @classmethod
     def reset_password(cls, email: str, token: str, new_password: str) -> bool:
-        player: QuerySet = cls.objects.filter(email=email)
-        if not player.exists():
-            raise cls.DoesNotExist
-        player: NormalPlayer = player.first()
-        forget_password_token = cache.get(f"{player.id}_FORGET_PASSWORD_TOKEN")
-        token_decrypt = decrypt_string(token)
-        if token_decrypt == forget_password_token:
+        player: NormalPlayer = cls.objects.only(*cls.AUTH_FIELDS).get(email=email)
+        forget_password_token = settings.REDIS_CLIENT.getdel(f"{player.id}_FORGET_PASSWORD_TOKEN")
+        if not forget_password_token:
+            return False
+        if hmac.compare_digest(forget_password_token.encode(), token.encode()):
             player.set_password(new_password)
             player.save()
             return True
-        cache.delete(f"{player.id}_FORGET_PASSWORD_TOKEN")
         return False
 
     def verify_email(self, otp: str) -> bool:
         if self.is_verified:
             return True
-        cached_otp = cache.get(f"{self.id}_EMAIL_VERIFY_OTP")
+        cached_otp = self._pop_otp()
         if cached_otp:
-            cache.delete(f"{self.id}_EMAIL_VERIFY_OTP")
             if cached_otp == otp:
+                NormalPlayer.objects.filter(pk=self.pk, is_verified=False).update(is_verified=True)
                 self.is_verified = True
-                self.save()
                 return True
 
         return False
@@ -423,12 +457,12 @@ class NormalPlayer(Player):
 
     @classmethod
     def attempt_login(cls, email: str, password: str):
-        user: QuerySet = cls.objects.filter(email=email)
-        if not user.exists():
+        user: NormalPlayer = cls.objects.only(*cls.AUTH_FIELDS).filter(email=email).first()
+        if user is None:
+            # Hash anyway so unknown accounts take as long to reject as wrong passwords.
+            make_password(password)
             return None, None, 'Invalid credentials.'
 
-        user: NormalPlayer = user.first()
-
         if not user.is_verified:
             return None, None, 'User is not verified.'
 
@@ -441,8 +475,5 @@ class NormalPlayer(Player):
 
     @classmethod
     def attempt_password_recovery(cls, email: str, deep_link: str):
-        player: QuerySet = cls.objects.filter(email=email)
-        if not player.exists():
-            raise cls.DoesNotExist
-        player: NormalPlayer = player.first()
+        player: NormalPlayer = cls.objects.only(*cls.AUTH_FIELDS).get(email=email)
         return player.forget_password(deep_link=deep_link)
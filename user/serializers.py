@@ -1,21 +1,23 @@
 from rest_framework import serializers
 
+from common.serializers import CachedFieldsSerializerMixin
+from player_shop.models import PlayerWallet
 from user.models import NormalPlayer, GuestPlayer, Player
 
 
-class NormalPlayerAuthSerializer(serializers.ModelSerializer):
+class NormalPlayerAuthSerializer(CachedFieldsSerializerMixin, serializers.ModelSerializer):
     
     class Meta:
         model = NormalPlayer
         fields = ['id', 'email', 'password', 'profile_name', 'gender', 'birth_date', 'first_name', 'last_name', ]
 
-class GuestPlayerAuthSerializer(serializers.ModelSerializer):
+class GuestPlayerAuthSerializer(CachedFieldsSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = GuestPlayer
         fields = ['id', 'device_id', 'recovery_string', 'profile_name', 'gender', 'birth_date', 'first_name', 'last_name']
 
 
-class NormalPlayerSignUpSerializer(serializers.ModelSerializer):
+class NormalPlayerSignUpSerializer(CachedFieldsSerializerMixin, serializers.ModelSerializer):
     email = serializers.EmailField(required=True, write_only=True)
     password = serializers.CharField(write_only=True)
 
@@ -32,7 +34,7 @@ class NormalPlayerSignUpSerializer(serializers.ModelSerializer):
         return NormalPlayer.create(email=email, password=password, **data)
 
 
-class NormalPlayerVerifySerializer(serializers.ModelSerializer):
+class NormalPlayerVerifySerializer(CachedFieldsSerializerMixin, serializers.ModelSerializer):
     email = serializers.EmailField(required=True)
     otp = serializers.CharField(write_only=True, required=True)
     profile_name = serializers.CharField(read_only=True)
@@ -50,7 +52,7 @@ class NormalPlayerVerifySerializer(serializers.ModelSerializer):
         return obj.get_token()
 
 
-class NormalPlayerSignInSerializer(serializers.ModelSerializer):
+class NormalPlayerSignInSerializer(CachedFieldsSerializerMixin, serializers.ModelSerializer):
     password = serializers.CharField(write_only=True)
     email = serializers.EmailField(required=True)
 
@@ -70,7 +72,7 @@ class NormalPlayerResetPasswordSerializer(serializers.Serializer):
     token = serializers.CharField(required=True)
 
 
-class GuestPlayerSignUpSerializer(serializers.ModelSerializer):
+class GuestPlayerSignUpSerializer(CachedFieldsSerializerMixin, serializers.ModelSerializer):
     device_id = serializers.CharField(required=True)
 
     class Meta:
@@ -86,7 +88,7 @@ class GuestPlayerSignUpSerializer(serializers.ModelSerializer):
         return GuestPlayer.create(device_id=device_id, password=password, **data)
 
 
-class GuestPlayerSignInSerializer(serializers.ModelSerializer):
+class GuestPlayerSignInSerializer(CachedFieldsSerializerMixin, serializers.ModelSerializer):
     password = serializers.CharField(write_only=True)
     device_id = serializers.CharField(required=True)
 
@@ -96,7 +98,7 @@ class GuestPlayerSignInSerializer(serializers.ModelSerializer):
                   'recovery_string']
 
 
-class GuestPlayerRecoverySerializer(serializers.ModelSerializer):
+class GuestPlayerRecoverySerializer(CachedFieldsSerializerMixin, serializers.ModelSerializer):
     recovery_string = serializers.CharField(write_only=True, required=True)
     device_id = serializers.CharField(required=True)
     password = serializers.CharField(write_only=True, required=False)
@@ -118,6 +120,8 @@ class PlayerAvatarSerializer(serializers.Serializer):
 
 
 class PlayerProfileSerializer(serializers.Serializer):
+    model_fields = ('id', 'profile_name', 'gender', 'birth_date', 'shop_info__id', )
+
     id = serializers.IntegerField(read_only=True)
     profile_name = serializers.CharField(read_only=True)
     gender = serializers.CharField(read_only=True)
@@ -127,10 +131,57 @@ class PlayerProfileSerializer(serializers.Serializer):
     @staticmethod
     def get_current_avatar(obj):
         current = obj.current_avatar
-        return PlayerAvatarSerializer(obj.current_avatar).data if current else None
+        return PlayerAvatarSerializer(current).data if current else None
+
+    @staticmethod
+    def setup_eager_loading(queryset, relation: str = None):
+        wallet_lookup = f'{relation}__shop_info' if relation else 'shop_info'
+        return queryset.prefetch_related(PlayerWallet.prefetch_current_assets(wallet_lookup))
+
+    @staticmethod
+    def fast_dict(obj) -> dict:
+        current = obj.current_avatar
+        return {
+            'id': obj.id,
+            'profile_name': obj.profile_name,
+            'gender': str(obj.gender) if obj.gender is not None else None,
+            'birth_date': obj.birth_date.isoformat() if obj.birth_date else None,
+            'current_avatar': {'id': current.id, 'config': current.config} if current else None,
+        }
+
+    @staticmethod
+    def values_dict(row: dict, relation: str, avatars: dict) -> dict:
+        player_id = row[f'{relation}__id']
+        gender = row[f'{relation}__gender']
+        birth_date = row[f'{relation}__birth_date']
+        return {
+            'id': player_id,
+            'profile_name': row[f'{relation}__profile_name'],
+            'gender': str(gender) if gender is not None else None,
+            'birth_date': birth_date.isoformat() if birth_date else None,
+            'current_avatar': avatars.get(player_id),
+        }
+
+
+class PlayerProfileField(serializers.Field):
+    model_fields = ('id', 'profile_name', 'gender', 'birth_date', )
+
+    def __init__(self, **kwargs):
+        kwargs['read_only'] = True
+        super(PlayerProfileField, self).__init__(**kwargs)
+
+    def to_representation(self, value):
+        return PlayerProfileSerializer.fast_dict(value)
+
+    @classmethod
+    def get_only_fields(cls, relation: str) -> list:
+        return [f'{relation}__{field}' for field in cls.model_fields]
 
 
 class PlayerProfileSelfRetrieveSerializer(PlayerProfileSerializer):
+    model_fields = ('id', 'profile_name', 'gender', 'birth_date', 'daily_reward_streak', 'last_claimed',
+                    'last_lucky_wheel_spin', 'shop_info__id', 'inviter__email', 'inviter__device_id', )
+
     daily_reward_streak = serializers.IntegerField(read_only=True)
     last_claimed = serializers.DateTimeField(read_only=True)
     last_lucky_wheel_spin = serializers.DateTimeField(read_only=True)
@@ -139,7 +190,8 @@ class PlayerProfileSelfRetrieveSerializer(PlayerProfileSerializer):
 
     @staticmethod
     def get_invites_count(obj: Player):
-        return obj.invite_count()
+        invites_count = getattr(obj, '_invites_count', None)
+        return obj.invite_count() if invites_count is None else invites_count
 
 
 class PlayerCacheSerializer(PlayerProfileSerializer):
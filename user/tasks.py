@@ -0,0 +1,40 @@
+from celery import shared_task
+from django.conf import settings
+from django.core.mail import send_mail
+from django.template.loader import render_to_string
+from django.utils import translation
+from django.utils.html import strip_tags
+from django.utils.translation import gettext as _
+
+
+def send_templated_email(email: str, subject: str, template_name: str, context: dict):
+    html_message = render_to_string(template_name, {
+        **context,
+        'project_name': settings.PROJECT_NAME,
+        'LANGUAGE_CODE': translation.get_language(),
+    })
+    send_mail(
+        subject=subject,
+        message=strip_tags(html_message),
+        from_email=settings.DEFAULT_FROM_EMAIL,
+        recipient_list=[email],
+        html_message=html_message,
+    )
+
+
+@shared_task
+def send_email_verification_task(email: str, username: str, otp: str, language: str):
+    with translation.override(language):
+        send_templated_email(email, _(f"{settings.PROJECT_NAME} email verification."), 'email_verification.html', {
+            'user': {'username': username},
+            'otp': otp,
+        })
+
+
+@shared_task
+def send_password_reset_task(email: str, username: str, reset_link: str, language: str):
+    with translation.override(language):
+        send_templated_email(email, _("Password Reset Request"), 'password_reset.html', {
+            'user': {'username': username},
+            'reset_link': reset_link,
+        })
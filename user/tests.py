@@ -1,14 +1,19 @@
+import json
 from datetime import timedelta
 from unittest.mock import patch
 
+from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.core import mail
 from django.core.cache import cache
 from django.utils import timezone
 from rest_framework import status
-from rest_framework.test import APITestCase
+from rest_framework.test import APITestCase, APIClient
+from rest_framework_simplejwt.tokens import AccessToken
 
-from user.models import NormalPlayer, GuestPlayer
+from user.models import User, NormalPlayer, GuestPlayer
+from user.serializers import PlayerProfileSerializer
+from user.tasks import send_email_verification_task, send_password_reset_task
 
 User = get_user_model()
 
@@ -21,12 +26,26 @@ class NormalPlayerAuthViewTests(APITestCase):
         cache.clear()
         mail.outbox = []
 
-    def tearDown(self):
-        """Clear cache after each test"""
+    @classmethod
+    def tearDownClass(cls):
+        """Drop cache entries that point at this class's rolled back fixtures"""
         cache.clear()
+        super().tearDownClass()
+
+    def tearDown(self):
+        """Clear per player OTP keys after each test"""
+        for pattern in ("*_EMAIL_VERIFY_OTP", "*_FORGET_PASSWORD_TOKEN"):
+            for key in settings.REDIS_CLIENT.scan_iter(pattern):
+                settings.REDIS_CLIENT.delete(key)
+
+    @staticmethod
+    def _make_verified(email='test@example.com', password='password123'):
+        """Create a normal player that is already verified in a single insert"""
+        return NormalPlayer.objects.create_user(email=email, password=password, is_verified=True)
 
     # SIGNUP TESTS
-    def test_signup_with_valid_data_creates_user_and_sends_email(self):
+    @patch('user.models.send_email_verification_task.delay', side_effect=send_email_verification_task)
+    def test_signup_with_valid_data_creates_user_and_sends_email(self, mock_delay):
         """When valid signup data is provided, user is created and verification email is sent"""
         data = {
             'email': 'test@example.com',
@@ -36,7 +55,8 @@ class NormalPlayerAuthViewTests(APITestCase):
             'last_name': 'User'
         }
 
-        response = self.client.post('/api/user/auth/player/signup/', data)
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post('/api/user/auth/player/signup/', data)
 
         # User should be created but not verified
         self.assertEqual(response.status_code, status.HTTP_201_CREATED)
@@ -44,9 +64,9 @@ class NormalPlayerAuthViewTests(APITestCase):
         self.assertIn('user', response.data)
 
         # Check user exists in database
-        user = NormalPlayer.objects.get(email='test@example.com')
-        self.assertFalse(user.is_verified)
-        self.assertEqual(user.profile_name, 'TestUser')
+        user = NormalPlayer.objects.values('is_verified', 'profile_name').get(email='test@example.com')
+        self.assertFalse(user['is_verified'])
+        self.assertEqual(user['profile_name'], 'TestUser')
 
         # Verification email should be sent
         self.assertEqual(len(mail.outbox), 1)
@@ -70,6 +90,22 @@ class NormalPlayerAuthViewTests(APITestCase):
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
         self.assertIn('error', response.data)
 
+    def test_signup_with_duplicate_email_skips_password_hashing(self):
+        """Duplicate signups should be rejected before the password is hashed"""
+        NormalPlayer.objects.create_user(
+            email='existing@example.com',
+            password='password123'
+        )
+
+        with patch('django.contrib.auth.base_user.make_password') as mock_make_password:
+            response = self.client.post('/api/user/auth/player/signup/', {
+                'email': 'existing@example.com',
+                'password': 'newpassword123'
+            })
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        mock_make_password.assert_not_called()
+
     def test_signup_with_invalid_email_returns_validation_error(self):
         """When invalid email format is provided, validation error is returned"""
         data = {
@@ -93,7 +129,8 @@ class NormalPlayerAuthViewTests(APITestCase):
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
 
     # EMAIL VERIFICATION TESTS
-    def test_email_verification_with_valid_otp_verifies_user(self):
+    @patch('user.models.NormalPlayer._pop_otp', return_value='123456')
+    def test_email_verification_with_valid_otp_verifies_user(self, mock_pop_otp):
         """When valid OTP is provided, user should be verified"""
         # Create unverified user
         user = NormalPlayer.objects.create_user(
@@ -101,9 +138,6 @@ class NormalPlayerAuthViewTests(APITestCase):
             password='password123'
         )
 
-        # Simulate OTP in cache (normally set during signup)
-        cache.set(f"{user.id}_EMAIL_VERIFY_OTP", "123456", 120)
-
         data = {
             'email': 'test@example.com',
             'otp': '123456'
@@ -119,13 +153,13 @@ class NormalPlayerAuthViewTests(APITestCase):
         user.refresh_from_db()
         self.assertTrue(user.is_verified)
 
-    def test_email_verification_with_invalid_otp_returns_error(self):
+    @patch('user.models.NormalPlayer._pop_otp', return_value='123456')
+    def test_email_verification_with_invalid_otp_returns_error(self, mock_pop_otp):
         """When invalid OTP is provided, verification should fail"""
         user = NormalPlayer.objects.create_user(
             email='test@example.com',
             password='password123'
         )
-        cache.set(f"{user.id}_EMAIL_VERIFY_OTP", "123456", 120)
 
         data = {
             'email': 'test@example.com',
@@ -153,13 +187,13 @@ class NormalPlayerAuthViewTests(APITestCase):
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
         self.assertIn('error', response.data)
 
-    def test_email_verification_with_expired_otp_returns_error(self):
+    @patch('user.models.NormalPlayer._pop_otp', return_value=None)
+    def test_email_verification_with_expired_otp_returns_error(self, mock_pop_otp):
         """When OTP has expired, verification should fail"""
         user = NormalPlayer.objects.create_user(
             email='test@example.com',
             password='password123'
         )
-        # Don't set OTP in cache (simulates expiration)
 
         data = {
             'email': 'test@example.com',
@@ -173,12 +207,7 @@ class NormalPlayerAuthViewTests(APITestCase):
     # LOGIN TESTS
     def test_login_with_valid_credentials_returns_tokens(self):
         """When valid credentials are provided, user gets authentication tokens"""
-        user = NormalPlayer.objects.create_user(
-            email='test@example.com',
-            password='password123'
-        )
-        user.is_verified = True
-        user.save()
+        self._make_verified()
 
         data = {
             'email': 'test@example.com',
@@ -193,6 +222,16 @@ class NormalPlayerAuthViewTests(APITestCase):
         self.assertIn('access', response.data['credentials'])
         self.assertIn('refresh', response.data['credentials'])
 
+    def test_login_does_not_load_deferred_columns(self):
+        """Login should fetch only auth columns without lazily loading the rest"""
+        self._make_verified()
+
+        with self.assertNumQueries(2):
+            user, token, errors = NormalPlayer.attempt_login(email='test@example.com', password='password123')
+
+        self.assertIsNone(errors)
+        self.assertIn('access', token)
+
     def test_login_with_unverified_user_returns_error(self):
         """When user is not verified, login should fail"""
         NormalPlayer.objects.create_user(
@@ -213,12 +252,7 @@ class NormalPlayerAuthViewTests(APITestCase):
 
     def test_login_with_invalid_credentials_returns_error(self):
         """When invalid credentials are provided, login should fail"""
-        user = NormalPlayer.objects.create_user(
-            email='test@example.com',
-            password='password123'
-        )
-        user.is_verified = True
-        user.save()
+        self._make_verified()
 
         data = {
             'email': 'test@example.com',
@@ -242,8 +276,22 @@ class NormalPlayerAuthViewTests(APITestCase):
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
         self.assertIn('error', response.data)
 
+    @patch('user.models.make_password')
+    def test_login_with_nonexistent_user_still_hashes_password(self, mock_make_password):
+        """Unknown emails should still pay for a password hash before being rejected"""
+        data = {
+            'email': 'nonexistent@example.com',
+            'password': 'password123'
+        }
+
+        response = self.client.post('/api/user/auth/player/login/', data)
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        mock_make_password.assert_called_once_with('password123')
+
     # PASSWORD RECOVERY TESTS
-    def test_password_recovery_request_with_valid_email_sends_reset_email(self):
+    @patch('user.models.send_password_reset_task.delay', side_effect=send_password_reset_task)
+    def test_password_recovery_request_with_valid_email_sends_reset_email(self, mock_delay):
         """When valid email is provided, password reset email is sent"""
         NormalPlayer.objects.create_user(
             email='test@example.com',
@@ -255,13 +303,15 @@ class NormalPlayerAuthViewTests(APITestCase):
             'deep_link': 'https://app.example.com/reset?token={token}'
         }
 
-        response = self.client.post('/api/user/auth/player/recovery/request/', data)
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post('/api/user/auth/player/recovery/request/', data)
 
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertIn('message', response.data)
 
-        # Reset email should be sent
-        self.assertGreaterEqual(len(mail.outbox), 1)  # Initial verification + reset email
+        # Reset email should be sent once the request commits
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertIn('test@example.com', mail.outbox[0].to)
 
     def test_password_recovery_request_with_nonexistent_email_returns_error(self):
         """When email doesn't exist, password recovery should fail"""
@@ -283,7 +333,7 @@ class NormalPlayerAuthViewTests(APITestCase):
         )
 
         # Simulate existing recovery token in cache
-        cache.set(f"{user.id}_FORGET_PASSWORD_TOKEN", "existing_token", 120)
+        settings.REDIS_CLIENT.set(f"{user.id}_FORGET_PASSWORD_TOKEN", "existing_token", ex=120)
 
         data = {
             'email': 'test@example.com',
@@ -295,6 +345,18 @@ class NormalPlayerAuthViewTests(APITestCase):
         self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
         self.assertIn('error', response.data)
 
+    def test_password_reset_token_can_only_be_used_once(self):
+        """A recovery token should be consumed by the first reset attempt"""
+        user = NormalPlayer.objects.create_user(email='test@example.com', password='password123')
+        success, token = user._forget_password_attempt()
+        self.assertTrue(success)
+
+        self.assertTrue(NormalPlayer.reset_password(email=user.email, token=token, new_password='newpassword123'))
+        self.assertFalse(NormalPlayer.reset_password(email=user.email, token=token, new_password='otherpassword'))
+
+        user.refresh_from_db()
+        self.assertTrue(user.check_password('newpassword123'))
+
     @patch('user.models.NormalPlayer.reset_password')
     def test_password_reset_with_valid_token_resets_password(self, mock_reset):
         """When valid token is provided, password should be reset"""
@@ -331,10 +393,13 @@ class NormalPlayerAuthViewTests(APITestCase):
 class GuestPlayerAuthViewTests(APITestCase):
     """Test GuestPlayer authentication behaviors"""
 
-    def setUp(self):
+    @classmethod
+    def tearDownClass(cls):
+        """Drop cache entries that point at this class's rolled back fixtures"""
         cache.clear()
+        super().tearDownClass()
 
-    def tearDown(self):
+    def setUp(self):
         cache.clear()
 
     # SIGNUP TESTS
@@ -354,9 +419,9 @@ class GuestPlayerAuthViewTests(APITestCase):
         self.assertIn('recovery_string', response.data['user'])
 
         # User should exist in database
-        user = GuestPlayer.objects.get(device_id='test-device-123')
-        self.assertIsNotNone(user.recovery_string)
-        self.assertTrue(user.profile_name.startswith('guest-'))  # Auto-generated if not provided
+        user = GuestPlayer.objects.values('recovery_string', 'profile_name').get(device_id='test-device-123')
+        self.assertIsNotNone(user['recovery_string'])
+        self.assertTrue(user['profile_name'].startswith('guest-'))  # Auto-generated if not provided
 
     def test_guest_signup_with_duplicate_device_id_returns_error(self):
         """When device_id already exists, signup should fail"""
@@ -505,9 +570,35 @@ class GuestPlayerAuthViewTests(APITestCase):
         self.assertIn('user', response.data)
 
         # Normal player should exist, guest should be converted
-        normal_player = NormalPlayer.objects.get(email='converted@example.com')
-        self.assertEqual(normal_player.profile_name, 'ConvertedUser')
-        self.assertFalse(normal_player.is_verified)  # Should need email verification
+        normal_player = NormalPlayer.objects.values('is_verified', 'profile_name').get(email='converted@example.com')
+        self.assertEqual(normal_player['profile_name'], 'ConvertedUser')
+        self.assertFalse(normal_player['is_verified'])  # Should need email verification
+
+    def test_guest_convert_keeps_user_row_and_switches_player_type(self):
+        """Converted guests should keep their user id and sign in as normal players with the new password"""
+        guest = GuestPlayer.objects.create_user(device_id='test-device-123', password='password123')
+
+        normal_player = guest.convert_to_normal_player(email='converted@example.com', password='newpassword123')
+
+        self.assertEqual(normal_player.pk, guest.pk)
+        self.assertFalse(GuestPlayer.objects.filter(pk=guest.pk).exists())
+        self.assertIsNone(normal_player.device_id)
+        self.assertEqual(normal_player.username, 'converted@example.com')
+        self.assertEqual(normal_player.profile_name, guest.profile_name)
+        self.assertTrue(normal_player.check_password('newpassword123'))
+
+    @patch('user.models.send_email_verification_task.delay')
+    def test_guest_convert_refreshes_cached_player(self, mock_delay):
+        """Converted guests should have their cached DTO rewritten with the new username and profile name"""
+        guest = GuestPlayer.objects.create_user(device_id='test-device-123', password='password123')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            guest.convert_to_normal_player(email='converted@example.com', password='newpassword123',
+                                           profile_name='ConvertedUser')
+
+        cached, = User.bulk_from_cache([guest.id])
+        self.assertEqual(cached['username'], 'converted@example.com')
+        self.assertEqual(cached['profile_name'], 'ConvertedUser')
 
     def test_guest_convert_requires_authentication(self):
         """Guest conversion should require authentication"""
@@ -565,37 +656,42 @@ class GuestPlayerAuthViewTests(APITestCase):
 class PlayerProfileViewTests(APITestCase):
     """Test PlayerProfileView behaviors for profile management and viewing"""
 
-    def setUp(self):
-        """Create test users for profile testing"""
-        self.normal_player = NormalPlayer.objects.create_user(
+    @classmethod
+    def setUpTestData(cls):
+        """Create test users for profile testing once per class"""
+        cls.normal_player = NormalPlayer.objects.create_user(
             email='normal@example.com',
             password='password123',
             profile_name='NormalPlayer',
             first_name='Normal',
-            last_name='Player'
+            last_name='Player',
+            is_verified=True
         )
-        self.normal_player.is_verified = True
-        self.normal_player.save()
 
-        self.guest_player = GuestPlayer.objects.create_user(
+        cls.guest_player = GuestPlayer.objects.create_user(
             device_id='guest-device-123',
             password='password123'
         )
 
-        self.other_player = NormalPlayer.objects.create_user(
+        cls.other_player = NormalPlayer.objects.create_user(
             email='other@example.com',
             password='password123',
-            profile_name='OtherPlayer'
+            profile_name='OtherPlayer',
+            is_verified=True
         )
-        self.other_player.is_verified = True
-        self.other_player.save()
+
+        cls.normal_client = APIClient()
+        cls.normal_client.force_authenticate(user=cls.normal_player)
+        cls.guest_client = APIClient()
+        cls.guest_client.force_authenticate(user=cls.guest_player)
+        cls.other_client = APIClient()
+        cls.other_client.force_authenticate(user=cls.other_player)
 
     # SELF PROFILE TESTS
     def test_authenticated_user_can_view_own_profile(self):
         """When authenticated user requests profile list, they get their own detailed profile"""
-        self.client.force_authenticate(user=self.normal_player)
-
-        response = self.client.get('/api/user/profile/')
+        with self.assertNumQueries(2):
+            response = self.normal_client.get('/api/user/profile/')
 
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(response.data['id'], self.normal_player.id)
@@ -605,11 +701,24 @@ class PlayerProfileViewTests(APITestCase):
         self.assertIn('last_claimed', response.data)
         self.assertIn('invites_count', response.data)
 
+    def test_own_profile_counts_invites_in_profile_query(self):
+        """Self profile should read the invite count and inviter from a single annotated query"""
+        self.other_player.inviter = self.normal_player
+        self.other_player.save()
+
+        response = self.other_client.get('/api/user/profile/')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['invites_count'], 0)
+        self.assertEqual(response.data['inviter'], str(self.normal_player))
+
+        response = self.normal_client.get('/api/user/profile/')
+        self.assertEqual(response.data['invites_count'], 1)
+
     def test_guest_user_can_view_own_profile(self):
         """Guest users should also be able to view their own profile"""
-        self.client.force_authenticate(user=self.guest_player)
-
-        response = self.client.get('/api/user/profile/')
+        with self.assertNumQueries(2):
+            response = self.guest_client.get('/api/user/profile/')
 
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(response.data['id'], self.guest_player.id)
@@ -623,9 +732,8 @@ class PlayerProfileViewTests(APITestCase):
 
     def test_authenticated_user_can_view_other_player_profile(self):
         """Authenticated users should be able to view other players' public profiles"""
-        self.client.force_authenticate(user=self.normal_player)
-
-        response = self.client.get(f'/api/user/profile/{self.other_player.id}/')
+        with self.assertNumQueries(2):
+            response = self.normal_client.get(f'/api/user/profile/{self.other_player.id}/')
 
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(response.data['id'], self.other_player.id)
@@ -637,9 +745,15 @@ class PlayerProfileViewTests(APITestCase):
 
     def test_viewing_nonexistent_player_returns_404(self):
         """Requesting non-existent player profile should return 404"""
-        self.client.force_authenticate(user=self.normal_player)
+        response = self.normal_client.get('/api/user/profile/99999/')
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
 
-        response = self.client.get('/api/user/profile/99999/')
+    def test_viewing_inactive_player_returns_404(self):
+        """Profiles of inactive players should not be served"""
+        User.objects.filter(pk=self.other_player.pk).update(is_active=False)
+
+        response = self.normal_client.get(f'/api/user/profile/{self.other_player.id}/')
 
         self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
 
@@ -648,3 +762,73 @@ class PlayerProfileViewTests(APITestCase):
         response = self.client.get(f'/api/user/profile/{self.other_player.id}/')
 
         self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_fast_profile_dict_matches_profile_serializer(self):
+        """The hand-rolled profile dict should render the same payload as the serializer"""
+        self.other_player.birth_date = timezone.now().date()
+        self.other_player.save()
+
+        self.assertEqual(
+            PlayerProfileSerializer.fast_dict(self.other_player),
+            PlayerProfileSerializer(self.other_player).data
+        )
+
+    def test_user_player_resolves_concrete_player_without_extra_query(self):
+        """User.player should come from the joined child row instead of a separate lookup"""
+        user = get_user_model().objects.get(pk=self.normal_player.pk)
+        guest = get_user_model().objects.get(pk=self.guest_player.pk)
+
+        with self.assertNumQueries(0):
+            self.assertIsInstance(user.player, NormalPlayer)
+            self.assertIsInstance(guest.player, GuestPlayer)
+        self.assertIs(self.normal_player.player, self.normal_player)
+
+    def test_cache_user_writes_redis_only_after_commit(self):
+        """Player cache entries should be published to Redis once the saving transaction commits"""
+        settings.REDIS_CLIENT.hdel('USERS', self.other_player.id)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.other_player.profile_name = 'RenamedPlayer'
+            self.other_player.save()
+            self.assertIsNone(settings.REDIS_CLIENT.hget('USERS', self.other_player.id))
+
+        cached = json.loads(settings.REDIS_CLIENT.hget('USERS', self.other_player.id))
+        self.assertEqual(cached['profile_name'], 'RenamedPlayer')
+
+    def test_cache_user_skips_unchanged_dto(self):
+        """Saving a player without touching cached fields should not republish its cache entry"""
+        player = NormalPlayer.objects.get(pk=self.other_player.pk)
+
+        with self.captureOnCommitCallbacks() as callbacks:
+            player.last_claimed = timezone.now()
+            player.save()
+        self.assertEqual(len(callbacks), 0)
+
+        with self.captureOnCommitCallbacks() as callbacks:
+            player.profile_name = 'RenamedAgain'
+            player.save()
+        cache_writes = [callback for callback in callbacks if getattr(callback, 'func', None) == User.write_user_cache]
+        self.assertEqual(len(cache_writes), 1)
+
+    def test_refresh_token_issues_new_credentials(self):
+        """Refreshing should read the user id from the refresh token and issue a fresh token pair"""
+        refresh = self.normal_player.get_token()['refresh']
+
+        token = NormalPlayer.refresh_token(refresh)
+
+        self.assertIn('access', token)
+        self.assertIn('refresh', token)
+        self.assertEqual(AccessToken(token['access'])['profile_name'], self.normal_player.profile_name)
+
+    def test_bulk_from_cache_returns_cached_players_in_order(self):
+        """Cached player entries should be fetched together and keep the requested order"""
+        missing_id = self.other_player.id + 1000
+        settings.REDIS_CLIENT.hdel('USERS', missing_id)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.other_player.reset_current_avatar()
+            self.other_player.cache_user()
+
+        cached = get_user_model().bulk_from_cache([self.other_player.id, missing_id])
+
+        self.assertEqual(cached[0]['profile_name'], self.other_player.profile_name)
+        self.assertIsNone(cached[1])
@@ -1,7 +1,7 @@
 from user.views import NormalPlayerAuthView, GuestPlayerAuthView, PlayerProfileView
-from rest_framework.routers import DefaultRouter
+from rest_framework.routers import SimpleRouter
 
-router = DefaultRouter()
+router = SimpleRouter()
 
 router.register('user/auth/player', NormalPlayerAuthView, basename='auth-player')
 router.register('user/auth/guest', GuestPlayerAuthView, basename='auth-guest')
@@ -1,5 +1,7 @@
+import secrets
+
 from django.db import IntegrityError
-from django.db.models import QuerySet
+from django.db.models import Count
 from django.shortcuts import get_object_or_404
 from django.utils.translation import gettext_lazy as _
 from rest_framework import viewsets, status, mixins
@@ -15,7 +17,6 @@ from user.serializers import NormalPlayerSignUpSerializer, NormalPlayerVerifySer
     GuestPlayerSignUpSerializer, GuestPlayerSignInSerializer, GuestPlayerRecoverySerializer, \
     NormalPlayerForgetPasswordRequestSerializer, NormalPlayerResetPasswordSerializer, PlayerProfileSerializer, \
     PlayerProfileSelfRetrieveSerializer, GuestConvertSerializer, NormalPlayerAuthSerializer, GuestPlayerAuthSerializer
-from utils.random_functions import generate_random_string
 
 
 class NormalPlayerAuthView(viewsets.GenericViewSet):
@@ -24,49 +25,50 @@ class NormalPlayerAuthView(viewsets.GenericViewSet):
     @action(methods=['POST'], detail=False, url_path="signup", url_name="signup",
             serializer_class=NormalPlayerSignUpSerializer)
     def player_signup(self, request, *args, **kwargs):
-        serializer = self.serializer_class(data=request.data)
+        serializer = self.get_serializer(data=request.data)
         serializer.is_valid(raise_exception=True)
+        if User.objects.filter(email=serializer.validated_data['email']).exists():
+            return Response({'error': _("User already exists.")}, status=status.HTTP_400_BAD_REQUEST)
         try:
             user = serializer.save()
         except IntegrityError as e:
             return Response({'error': _("User already exists.")}, status=status.HTTP_400_BAD_REQUEST)
 
-        return Response(data={"message": _(f"OTP is sent to {user.email}."), "user": self.serializer_class(user).data},
+        return Response(data={"message": _(f"OTP is sent to {user.email}."), "user": serializer.data},
                         status=status.HTTP_201_CREATED)
 
     @action(methods=['POST'], detail=False, url_path="signup/verify", url_name="signup-verify",
             serializer_class=NormalPlayerVerifySerializer)
     def player_email_verify(self, request, *args, **kwargs):
-        serializer = self.serializer_class(data=request.data)
+        serializer = self.get_serializer(data=request.data)
         serializer.is_valid(raise_exception=True)
         data = serializer.validated_data
-        user: QuerySet = NormalPlayer.objects.filter(email=data['email'])
-        if not user.exists():
+        user: NormalPlayer = NormalPlayer.objects.only(*NormalPlayer.AUTH_FIELDS).filter(email=data['email']).first()
+        if user is None:
             return Response({'error': _("Invalid email.")}, status=status.HTTP_400_BAD_REQUEST)
-        user: NormalPlayer = user.first()
-        verified = user.verify_email(otp=data["otp"])
-        credentials = user.get_token()
-        if verified:
-            return Response(data={'user': NormalPlayerAuthSerializer(user).data, 'credentials': credentials, "message": _("Verified successfully")},
+        if user.verify_email(otp=data["otp"]):
+            return Response(data={'user': NormalPlayerAuthSerializer(user).data, 'credentials': user.get_token(),
+                                  "message": _("Verified successfully")},
                             status=status.HTTP_200_OK)
         return Response(data={'error': _('Invalid OTP.')}, status=status.HTTP_406_NOT_ACCEPTABLE)
 
     @action(methods=['POST'], detail=False, url_path="login", url_name="login",
             serializer_class=NormalPlayerSignInSerializer)
     def player_signin(self, request, *args, **kwargs):
-        serializer = self.serializer_class(data=request.data)
+        serializer = self.get_serializer(data=request.data)
         serializer.is_valid(raise_exception=True)
         data = serializer.validated_data
         user, token, errors = NormalPlayer.attempt_login(email=data["email"], password=data["password"])
         if errors:
             return Response(data={'error': errors}, status=status.HTTP_400_BAD_REQUEST)
-        return Response(data={'credentials': token, 'user': self.serializer_class(user).data},
+        serializer.instance = user
+        return Response(data={'credentials': token, 'user': serializer.data},
                         status=status.HTTP_200_OK)
 
     @action(methods=['POST'], detail=False, url_path="recovery/request", url_name="recovery-request",
             serializer_class=NormalPlayerForgetPasswordRequestSerializer)
     def player_forget_password_request(self, request, *args, **kwargs):
-        serializer = self.serializer_class(data=request.data)
+        serializer = self.get_serializer(data=request.data)
         serializer.is_valid(raise_exception=True)
         data = serializer.validated_data
         deep_link = data['deep_link']
@@ -82,7 +84,7 @@ class NormalPlayerAuthView(viewsets.GenericViewSet):
     @action(methods=['POST'], detail=False, url_path="recovery/verify", url_name="recovery-verify",
             serializer_class=NormalPlayerResetPasswordSerializer)
     def player_reset_password_verify(self, request, *args, **kwargs):
-        serializer = self.serializer_class(data=request.data)
+        serializer = self.get_serializer(data=request.data)
         serializer.is_valid(raise_exception=True)
         data = serializer.validated_data
         token = data['token']
@@ -100,9 +102,9 @@ class GuestPlayerAuthView(viewsets.GenericViewSet):
     @action(methods=['POST'], detail=False, url_path="signup", url_name="signup",
             serializer_class=GuestPlayerSignUpSerializer)
     def guest_signup(self, request, *args, **kwargs):
-        serializer = self.serializer_class(data=request.data)
+        serializer = self.get_serializer(data=request.data)
         serializer.is_valid(raise_exception=True)
-        password = generate_random_string(length=10)
+        password = secrets.token_urlsafe(8)
         try:
             user = serializer.save(password=password)
             credentials = user.get_token()
@@ -114,35 +116,37 @@ class GuestPlayerAuthView(viewsets.GenericViewSet):
     @action(methods=['POST'], detail=False, url_path="login", url_name="login",
             serializer_class=GuestPlayerSignInSerializer)
     def guest_signin(self, request, *args, **kwargs):
-        serializer = self.serializer_class(data=request.data)
+        serializer = self.get_serializer(data=request.data)
         serializer.is_valid(raise_exception=True)
         data = serializer.validated_data
         user, token, errors = GuestPlayer.attempt_login(device_id=data["device_id"], password=data["password"])
         if errors:
             return Response(data={'error': errors}, status=status.HTTP_400_BAD_REQUEST)
-        return Response(data={'credentials': token, 'user': self.serializer_class(user).data},
+        serializer.instance = user
+        return Response(data={'credentials': token, 'user': serializer.data},
                         status=status.HTTP_200_OK)
 
     @action(methods=['POST'], detail=False, url_path="recovery", url_name="recovery",
             serializer_class=GuestPlayerRecoverySerializer)
     def guest_recovery(self, request, *args, **kwargs):
         # Will change
-        serializer = self.serializer_class(data=request.data)
+        serializer = self.get_serializer(data=request.data)
         serializer.is_valid(raise_exception=True)
         data = serializer.validated_data
-        password = generate_random_string(length=10)
+        password = secrets.token_urlsafe(8)
         user, token, errors = GuestPlayer.attempt_recovery(device_id=data["device_id"],
                                                            recovery_string=data["recovery_string"],
                                                            new_password=password)
         if errors:
             return Response(data={'error': errors}, status=status.HTTP_400_BAD_REQUEST)
-        return Response(data={'credentials': token, 'user': {**self.serializer_class(user).data, 'password': password}},
+        serializer.instance = user
+        return Response(data={'credentials': token, 'user': {**serializer.data, 'password': password}},
                         status=status.HTTP_200_OK)
 
     @action(methods=['POST'], detail=False, url_path='convert', url_name='convert', permission_classes=[IsGuestPlayer],
             serializer_class=GuestConvertSerializer)
     def guest_convert(self, request, *args, **kwargs):
-        serializer = self.serializer_class(data=request.data)
+        serializer = self.get_serializer(data=request.data)
         serializer.is_valid(raise_exception=True)
         data = serializer.validated_data
         player: GuestPlayer = self.request.user.player
@@ -166,10 +170,15 @@ class PlayerProfileView(viewsets.GenericViewSet, mixins.ListModelMixin, mixins.R
 
     def get_object(self):
         lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
-        user = get_object_or_404(User, pk=self.kwargs[lookup_url_kwarg])
+        queryset = self.get_queryset().select_related(None).select_related('shop_info') \
+            .only(*PlayerProfileSerializer.model_fields)
+        user = get_object_or_404(queryset, pk=self.kwargs[lookup_url_kwarg])
+        self.check_object_permissions(self.request, user)
         return user
 
     def list(self, request, *args, **kwargs):
-        player = self.request.user
+        player = self.get_queryset().select_related(None).select_related('shop_info', 'inviter') \
+            .only(*PlayerProfileSelfRetrieveSerializer.model_fields) \
+            .annotate(_invites_count=Count('invites')).get(pk=self.request.user.pk)
         serializer = PlayerProfileSelfRetrieveSerializer(player)
         return Response(data=serializer.data, status=status.HTTP_200_OK)
@@ -1,17 +1,24 @@
+import base64
+import os
+
 from django.conf import settings
 
+NONCE_SIZE = 12
+
+
+def encrypt_bytes(plain_bytes: bytes) -> bytes:
+    nonce = os.urandom(NONCE_SIZE)
+    return base64.urlsafe_b64encode(nonce + settings.AES_GCM.encrypt(nonce, plain_bytes, None))
+
+
+def decrypt_bytes(encrypted_bytes: bytes) -> bytes:
+    encrypted_bytes = base64.urlsafe_b64decode(encrypted_bytes)
+    return settings.AES_GCM.decrypt(encrypted_bytes[:NONCE_SIZE], encrypted_bytes[NONCE_SIZE:], None)
+
 
 def encrypt_string(plain_text: str) -> str:
-    cipher_suite = settings.CIPHER_SUITE
-    plaintext_bytes = plain_text.encode()
-    encrypted_bytes = cipher_suite.encrypt(plaintext_bytes)
-    encrypted_string = encrypted_bytes.decode()
-    return encrypted_string
-
-
-def decrypt_string(plain_text: str) -> str:
-    cipher_suite = settings.CIPHER_SUITE
-    encrypted_bytes = plain_text.encode()
-    decrypted_bytes = cipher_suite.decrypt(encrypted_bytes)
-    decrypted_string = decrypted_bytes.decode()
-    return decrypted_string
+    return encrypt_bytes(plain_text.encode()).decode()
+
+
+def decrypt_string(encrypted_text: str) -> str:
+    return decrypt_bytes(encrypted_text.encode()).decode()
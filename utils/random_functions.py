@@ -1,6 +1,6 @@
-import random
-import string
+import base64
+import os
 
 
 def generate_random_string(length: int = 8) -> str:
-    return ''.join(random.choices(string.ascii_uppercase + string.digits, k=length))
+    return base64.b32encode(os.urandom((length * 5 + 7) // 8)).decode('ascii').rstrip('=')[:length]